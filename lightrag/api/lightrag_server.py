@@ -49,7 +49,10 @@ from lightrag.api.routers.document_routes import (
 )
 from lightrag.api.routers.query_routes import create_query_routes
 from lightrag.api.routers.graph_routes import create_graph_routes
-from lightrag.api.routers.product_ingestion_routes import create_product_ingestion_routes
+from lightrag.api.routers.product_ingestion_routes import (
+    close_product_ingestion_clients,
+    create_product_ingestion_routes,
+)
 from lightrag.api.routers.naive_query_routes import create_naive_query_routes
 from lightrag.api.routers.ollama_api import OllamaAPI
 
@@ -242,6 +245,7 @@ def create_app(args):
         finally:
             # Clean up database connections
             await rag.finalize_storages()
+            await close_product_ingestion_clients()
 
             # Clean up shared data
             finalize_share_data()
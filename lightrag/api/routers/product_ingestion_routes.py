@@ -8,9 +8,12 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
+from lightrag.utils import get_env_value
+
 logger = logging.getLogger(__name__)
 
 # Lazy imports to avoid circular dependencies and improve startup time
@@ -29,6 +32,12 @@ def _get_mongodb_client():
     return _mongodb_client
 
 
+def _json_response(content: Dict[str, Any]) -> Response:
+    """JSON response encoded with the ingestion serializer (orjson when available)"""
+    from lightrag.services.product_ingestion.utils.serialization import json_dumps
+    return Response(content=json_dumps(content), media_type="application/json")
+
+
 def _get_product_ingestion_service():
     """Lazy import of ProductIngestionService"""
     global _product_ingestion_service
@@ -47,6 +56,14 @@ def _get_ingestion_config():
     return _ingestion_config
 
 
+async def close_product_ingestion_clients():
+    """Close the shared product MongoDB pools (on server shutdown)"""
+    from lightrag.services.product_ingestion.clients.mongo_pool import (
+        close_async_mongo_client, close_mongo_client)
+    close_mongo_client()
+    await close_async_mongo_client()
+
+
 def sanitize_mongodb_document(doc: Dict[str, Any]) -> Dict[str, Any]:
     """Convert MongoDB ObjectIds to strings for JSON serialization"""
     if doc is None:
@@ -184,8 +201,8 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
             mongodb_client = MongoDBClient()
 
             # Get collection stats
-            stats = mongodb_client.get_collection_stats(database, collection)
-            sample_product = mongodb_client.get_sample_product(
+            stats = await mongodb_client.get_collection_stats(database, collection)
+            sample_product = await mongodb_client.get_sample_product(
                 database, collection)
 
             total_docs = stats.get("total_documents", 0)
@@ -239,11 +256,22 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
             ProductIngestionService = _get_product_ingestion_service()
             IngestionConfig = _get_ingestion_config()
 
-            # Create ingestion config
-            config = IngestionConfig(
-                batch_size=request.batch_size,
-                working_dir=request.working_dir
-            )
+            # Create ingestion config (LIGHTRAG_AUTOTUNE sizes batches from the host)
+            if get_env_value("LIGHTRAG_AUTOTUNE", False, bool):
+                # A batch_size the caller actually sent beats the tuned one
+                overrides = {"working_dir": request.working_dir}
+                if "batch_size" in request.model_fields_set:
+                    overrides["batch_size"] = request.batch_size
+                config = IngestionConfig.autotune(**overrides)
+                logger.info(
+                    f"LIGHTRAG_AUTOTUNE: batch_size {config.batch_size} "
+                    f"({'requested' if 'batch_size' in overrides else 'tuned'}), "
+                    f"max_workers {config.max_workers}")
+            else:
+                config = IngestionConfig(
+                    batch_size=request.batch_size,
+                    working_dir=request.working_dir
+                )
 
             # Create service instance
             service = ProductIngestionService(config)
@@ -253,7 +281,7 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
 
             # Estimate job size for response
             try:
-                stats = service.get_collection_stats(
+                stats = await service.get_collection_stats(
                     request.database, request.collection)
                 # Use active_products count if available, otherwise total_documents
                 total_docs = stats.get(
@@ -261,7 +289,7 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
                 if request.limit:
                     total_docs = min(total_docs, request.limit)
                 estimated_batches = (
-                    total_docs + request.batch_size - 1) // request.batch_size if total_docs > 0 else 0
+                    total_docs + config.batch_size - 1) // config.batch_size if total_docs > 0 else 0
             except Exception as e:
                 logger.warning(f"Could not estimate job size: {e}")
                 estimated_batches = None
@@ -302,14 +330,16 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
     @router.get(
         "/jobs"
     )
-    async def list_jobs() -> Dict[str, Any]:
+    async def list_jobs() -> Response:
         """
         List all product ingestion jobs and their status.
         """
-        return {
+        # Finished jobs carry every batch result; encode them directly
+        # instead of walking them through jsonable_encoder
+        return _json_response({
             "jobs": running_jobs,
             "total_jobs": len(running_jobs)
-        }
+        })
 
     @router.get(
         "/jobs/{job_id}"
@@ -319,7 +349,7 @@ def create_product_ingestion_routes(api_key: Optional[str] = None):
         if job_id not in running_jobs:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        return {"job_id": job_id, **running_jobs[job_id]}
+        return _json_response({"job_id": job_id, **running_jobs[job_id]})
 
     @router.post("/cancel/{job_id}")
     async def cancel_ingestion_job(job_id: str):
@@ -411,7 +441,7 @@ async def run_ingestion_job(
         finally:
             # Always cleanup resources
             try:
-                service.cleanup()
+                await service.cleanup()
             except Exception as cleanup_error:
                 logger.warning(f"Error during cleanup: {cleanup_error}")
 
@@ -2193,6 +2193,12 @@ async def extract_entities(
         language=language,
     )
 
+    # The system prompt holds no chunk text, so every extraction call shares
+    # the same prefix and the provider's prompt cache can serve it
+    entity_extraction_system_prompt = PROMPTS[
+        "entity_extraction_system_prompt"
+    ].format(**context_base)
+
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
 
@@ -2215,9 +2221,6 @@ async def extract_entities(
         cache_keys_collector = []
 
         # Get initial extraction
-        entity_extraction_system_prompt = PROMPTS[
-            "entity_extraction_system_prompt"
-        ].format(**{**context_base, "input_text": content})
         entity_extraction_user_prompt = PROMPTS["entity_extraction_user_prompt"].format(
             **{**context_base, "input_text": content}
         )
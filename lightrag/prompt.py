@@ -60,14 +60,6 @@ You are a Knowledge Graph Specialist responsible for extracting entities and rel
 
 ---Examples---
 {examples}
-
----Real Data to be Processed---
-<Input>
-Entity_types: [{entity_types}]
-Text:
-```
-{input_text}
-```
 """
 
 PROMPTS["entity_extraction_user_prompt"] = """---Task---
@@ -79,6 +71,14 @@ Extract entities and relationships from the input text to be processed.
 3.  **Completion Signal:** Output `{completion_delimiter}` as the final line after all relevant entities and relationships have been extracted and presented.
 4.  **Oputput Language:** Ensure the output language is {language}. Proper nouns (e.g., personal names, place names, organization names) must be kept in their original language and not translated.
 
+---Real Data to be Processed---
+<Input>
+Entity_types: [{entity_types}]
+Text:
+```
+{input_text}
+```
+
 <Output>
 """
 
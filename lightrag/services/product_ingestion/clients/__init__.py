@@ -1,6 +1,10 @@
 """Database and API clients"""
 
+from .mongo_pool import (get_mongo_client, close_mongo_client,
+                         get_async_mongo_client, close_async_mongo_client)
 from .mongodb_client import MongoDBClient
 from .lightrag_client import LightRAGClient
 
-__all__ = ['MongoDBClient', 'LightRAGClient']
+__all__ = ['get_mongo_client', 'close_mongo_client',
+           'get_async_mongo_client', 'close_async_mongo_client',
+           'MongoDBClient', 'LightRAGClient']
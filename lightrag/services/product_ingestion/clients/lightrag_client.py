@@ -1,123 +1,463 @@
 """LightRAG client wrapper with enhanced functionality"""
 
 import os
+import asyncio
+import base64
+import hashlib
+import functools
+import gzip
 import logging
-from typing import Optional, List
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Set, Tuple
+import aiofiles
+import httpx
 import numpy as np
-from openai import OpenAI, AzureOpenAI
+from openai import AsyncAzureOpenAI
 
 from lightrag import LightRAG, QueryParam
-from lightrag.utils import EmbeddingFunc
+from lightrag.utils import (EmbeddingFunc, compute_mdhash_id, get_env_value,
+                            sanitize_text_for_encoding)
+from lightrag.base import DocStatus
+from lightrag.prompt import PROMPTS
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
+from ..utils.rate_limit import TokenBucket
+
 logger = logging.getLogger("lightrag_client")
 
+# Connection pool shared by all LLM / embedding calls of a client
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
 
-class LightRAGClient:
-    """Enhanced LightRAG client with optimized configuration"""
+# Per-request timeouts; the SDK does not retry, failed batches are retried
+# (with backoff) by ProductIngestionService instead
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
 
-    def __init__(self, working_dir: str):
-        """Initialize LightRAG client"""
-        self.working_dir = working_dir
-        self.rag: Optional[LightRAG] = None
+# Opt-in gzip of request bodies of at least GZIP_MIN_BYTES (large prompts)
+AZURE_GZIP_REQUESTS = get_env_value("AZURE_GZIP_REQUESTS", False, bool)
+GZIP_MIN_BYTES = 8192
 
-        # Initialize LLM and embedding functions
-        self.llm_func = self._create_llm_function()
-        self.embedding_func = self._create_embedding_function()
-
-    def _create_llm_function(self):
-        """Create Azure OpenAI LLM function"""
-        async def azure_openai_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs) -> str:
-            client = AzureOpenAI(
-                api_key=os.getenv("LLM_BINDING_API_KEY"),
-                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-                azure_endpoint=os.getenv("LLM_BINDING_HOST"),
-            )
-            messages = []
-
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            if history_messages:
-                messages.extend(history_messages)
-            messages.append({"role": "user", "content": prompt})
-
-            # Log what type of LLM processing is happening
-            task_type = "entity extraction" if "extract" in prompt.lower() else "text analysis"
-            prompt_chars = len(prompt)
-            estimated_tokens = prompt_chars // 4  # Rough estimate: 4 chars per token
-            logger.info(
-                f"🧠 Calling LLM for {task_type}")
-            logger.info(
-                f"   📊 Prompt size: {prompt_chars:,} chars (~{estimated_tokens:,} tokens)")
-            logger.info(f"   🔄 Processing request...")
-
-            # Log a sample of the prompt to debug
-            if logger.isEnabledFor(logging.DEBUG):
-                logger.debug(f"🔍 Prompt preview: {prompt[:200]}...")
-
-            response = client.chat.completions.create(
-                model=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
-                messages=messages,
-                # Changed from 0 to 1
-                temperature=kwargs.get("temperature", 1),
-                # Remove token limit to allow maximum response length
-            )
+# Number of embedding vectors kept in the per-client LRU cache
+EMBEDDING_CACHE_SIZE = get_env_value("EMBEDDING_CACHE_SIZE", 4096, int)
 
-            content = response.choices[0].message.content
-            finish_reason = response.choices[0].finish_reason
+# Entity extraction output ends with this marker; streaming stops there
+COMPLETION_DELIMITER = PROMPTS["DEFAULT_COMPLETION_DELIMITER"]
 
-            # Check for token limit issues
-            if finish_reason == "length":
-                logger.warning(
-                    f"⚠️  LLM hit model's maximum token limit for {task_type} - response may be incomplete")
-                if hasattr(response, 'usage'):
-                    logger.debug(
-                        f"🔍 Token usage: {response.usage.completion_tokens} completion tokens (no limit set)")
+# Fixed openings of LightRAG's extraction prompts, for a cheap startswith test
+_EXTRACTION_PROMPT_PREFIXES = tuple(
+    PROMPTS[name].split("{", 1)[0][:64]
+    for name in ("entity_extraction_user_prompt",
+                 "entity_continue_extraction_user_prompt"))
 
-            if not content or content.strip() == "":
-                logger.warning(
-                    f"⚠️  LLM returned empty response for {task_type} (finish_reason: {finish_reason})")
-                logger.debug(f"🔍 Full response: {response}")
-                return ""
+# Azure accepts at most this many inputs per embeddings request
+EMBEDDING_MAX_INPUTS = 2048
 
-            logger.info(
-                f"✅ LLM response received ({len(content)} chars, finish_reason: {finish_reason})")
+# How long an embedding request waits for others to share its API call
+EMBEDDING_COALESCE_DELAY = 0.005
 
-            # Log completion delimiter check
-            if "<|COMPLETE|>" not in content:
-                logger.warning(
-                    f"⚠️  LLM response missing completion delimiter for {task_type}")
-                logger.debug(f"🔍 Response preview: {content[:200]}...")
+# Max LLM + embedding HTTP requests in flight per client
+LLM_MAX_CONCURRENCY = get_env_value("LLM_MAX_CONCURRENCY", 16, int)
 
-            return content
+# Optional per-deployment rate limits (unset = no client-side limiting)
+AZURE_TPM = get_env_value("AZURE_TPM", None, int)
+AZURE_RPM = get_env_value("AZURE_RPM", None, int)
+AZURE_EMBEDDING_TPM = get_env_value("AZURE_EMBEDDING_TPM", None, int)
+AZURE_EMBEDDING_RPM = get_env_value("AZURE_EMBEDDING_RPM", None, int)
 
-        return azure_openai_llm_func
+# Timeout for inserting a single product, in seconds
+INSERT_TIMEOUT_SECONDS = get_env_value("LIGHTRAG_INSERT_TIMEOUT", 600, int)
 
-    def _create_embedding_function(self):
-        """Create Azure embedding function"""
-        async def azure_embedding_func(texts: List[str]) -> np.ndarray:
-            client = AzureOpenAI(
-                api_key=os.getenv("AZURE_EMBEDDING_API_KEY"),
-                api_version=os.getenv("AZURE_EMBEDDING_API_VERSION"),
-                azure_endpoint=os.getenv("AZURE_EMBEDDING_ENDPOINT"),
-            )
+# Seconds between document status checks while a batch waits for the pipeline
+INSERT_POLL_INTERVAL = 1.0
 
-            # Log embedding generation
-            total_chars = sum(len(text) for text in texts)
-            logger.info(
-                f"🔗 Generating embeddings for {len(texts)} text chunks ({total_chars} total chars)...")
+# Document states that mean the pipeline has not finished with a document
+_UNFINISHED_STATES = (DocStatus.PENDING, DocStatus.PROCESSING)
 
-            response = client.embeddings.create(
-                model=os.getenv("AZURE_EMBEDDING_DEPLOYMENT"),
-                input=texts
-            )
+# Append-only log of product ids already inserted, relative to working_dir
+COMPLETED_IDS_FILE = "ingested_product_ids.ckpt"
 
-            logger.info(
-                f"✅ Embeddings generated ({len(response.data)} vectors)")
-            embeddings = [item.embedding for item in response.data]
-            return np.array(embeddings)
 
-        return azure_embedding_func
+def _embedding_key(text: str) -> bytes:
+    """Compact cache key for an embedding input"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _decode_embedding(data: str) -> np.ndarray:
+    """Decode a base64 embedding from the API into a float32 vector"""
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def _make_bucket(tpm: Optional[int], rpm: Optional[int]) -> Optional[TokenBucket]:
+    """Build a deployment's token bucket when either limit is configured"""
+    if not tpm and not rpm:
+        return None
+    # An unset limit is effectively unbounded
+    return TokenBucket(tpm=tpm or 10**12, rpm=rpm or 10**9)
+
+
+class _GzipTransport(httpx.AsyncBaseTransport):
+    """
+    Send large request bodies gzip-compressed
+
+    Entity extraction prompts run to ~100 KB of repetitive product text.
+    If the endpoint answers 415 the body is resent uncompressed and
+    compression stays off for the rest of the client's life.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._enabled = True
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        if (not self._enabled or len(body) < GZIP_MIN_BYTES
+                or "content-encoding" in request.headers):
+            return await self._transport.handle_async_request(request)
+
+        headers = request.headers.copy()
+        del headers["content-length"]
+        headers["content-encoding"] = "gzip"
+        compressed = httpx.Request(
+            request.method, request.url, headers=headers,
+            content=gzip.compress(body, compresslevel=6),
+            extensions=request.extensions,
+        )
+        response = await self._transport.handle_async_request(compressed)
+        if response.status_code != 415:
+            return response
+
+        await response.aclose()
+        self._enabled = False
+        logger.warning(
+            f"⚠️  {request.url.host} rejected gzip request bodies, sending them uncompressed")
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _http_client() -> httpx.AsyncClient:
+    """HTTP client for one Azure deployment"""
+    if AZURE_GZIP_REQUESTS:
+        # Limits belong to the transport once a custom one is supplied
+        return httpx.AsyncClient(transport=_GzipTransport(
+            httpx.AsyncHTTPTransport(limits=HTTP_LIMITS)))
+    return httpx.AsyncClient(limits=HTTP_LIMITS)
+
+
+class _EmbeddingCoalescer:
+    """
+    Merge concurrent embedding requests into shared API calls
+
+    LightRAG embeds chunks in many small concurrent calls; requests that
+    arrive within EMBEDDING_COALESCE_DELAY of each other (or until
+    EMBEDDING_MAX_INPUTS texts are queued) go out as one request and each
+    caller gets its own slice of the vectors back.
+    """
+
+    __slots__ = ("_request", "_pending", "_pending_inputs", "_timer", "_tasks")
+
+    def __init__(self, request: Callable[[List[str]], Awaitable[List[np.ndarray]]]):
+        self._request = request
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_inputs = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Queue texts for the next shared request and wait for their vectors"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_inputs += len(texts)
+
+        if self._pending_inputs >= EMBEDDING_MAX_INPUTS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(EMBEDDING_COALESCE_DELAY, self._flush)
+        return await future
+
+    def _flush(self):
+        """Send everything queued so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        self._pending_inputs = 0
+        if pending:
+            task = asyncio.ensure_future(self._send(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: List[Tuple[List[str], asyncio.Future]]):
+        """Issue the shared request(s) and hand each caller its vectors"""
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        try:
+            vectors = []
+            for start in range(0, len(texts), EMBEDDING_MAX_INPUTS):
+                vectors.extend(await self._request(texts[start:start + EMBEDDING_MAX_INPUTS]))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+
+@dataclass(eq=False)
+class ClientConfig:
+    """API client and per-client state shared by the LLM / embedding functions"""
+    client: AsyncAzureOpenAI
+    model: Optional[str]
+    sem: asyncio.Semaphore
+    bucket: Optional[TokenBucket] = None
+    embedding_dim: int = 0
+    # Embedding LRU cache and request coalescer (embedding configs only)
+    cache: OrderedDict = field(default_factory=OrderedDict)
+    coalescer: Optional[_EmbeddingCoalescer] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _read_env(*names: str) -> Tuple[Optional[str], ...]:
+    """Read deployment settings from the environment once per process"""
+    return tuple(os.getenv(name) for name in names)
+
+
+def _build_config(api_key: str, api_version: str, endpoint: str,
+                  deployment: str, sem: asyncio.Semaphore,
+                  bucket: Optional[TokenBucket], embedding_dim: int = 0) -> ClientConfig:
+    """Build a deployment's API client and wrap it in a ClientConfig"""
+    api_key, api_version, endpoint, deployment = _read_env(
+        api_key, api_version, endpoint, deployment)
+    return ClientConfig(
+        client=AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=endpoint,
+            http_client=_http_client(),
+            max_retries=0,
+            timeout=HTTP_TIMEOUT,
+        ),
+        model=deployment,
+        sem=sem,
+        bucket=bucket,
+        embedding_dim=embedding_dim,
+    )
+
+
+async def azure_openai_llm_func(cfg: ClientConfig, prompt, system_prompt=None,
+                                history_messages=[], **kwargs) -> str:
+    """Azure OpenAI LLM function; bind `cfg` with functools.partial"""
+    messages = []
+
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    if history_messages:
+        messages.extend(history_messages)
+    messages.append({"role": "user", "content": prompt})
+
+    # Log what type of LLM processing is happening
+    is_extraction = prompt.startswith(_EXTRACTION_PROMPT_PREFIXES)
+    task_type = "entity extraction" if is_extraction else "text analysis"
+    prompt_chars = len(prompt)
+    estimated_tokens = prompt_chars // 4  # Rough estimate: 4 chars per token
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            f"🧠 Calling LLM for {task_type}")
+        logger.info(
+            f"   📊 Prompt size: {prompt_chars:,} chars (~{estimated_tokens:,} tokens)")
+        logger.info(f"   🔄 Processing request...")
+
+    # Log a sample of the prompt to debug
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"🔍 Prompt preview: {prompt[:200]}...")
+
+    if cfg.bucket is not None:
+        await cfg.bucket.acquire(estimated_tokens + (len(system_prompt) // 4 if system_prompt else 0))
+
+    # Stream the completion so the call returns as soon as the
+    # completion delimiter arrives instead of at end of generation
+    parts = []
+    tail = ""
+    finish_reason = None
+    async with cfg.sem:
+        stream = await cfg.client.chat.completions.create(
+            model=cfg.model,
+            messages=messages,
+            # Changed from 0 to 1
+            temperature=kwargs.get("temperature", 1),
+            # Remove token limit to allow maximum response length
+            stream=True,
+        )
+        async with stream:
+            async for chunk in stream:
+                # Azure sends content-filter chunks without choices
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                delta = choice.delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                # The delimiter usually arrives split over several chunks
+                # ("<|", "COMPLETE", "|>"), so search a rolling tail that
+                # covers it plus the newest chunk
+                tail = (tail + delta)[-(len(COMPLETION_DELIMITER) + len(delta)):]
+                if COMPLETION_DELIMITER in tail:
+                    finish_reason = finish_reason or "stop"
+                    break
+
+    content = "".join(parts)
+
+    # Check for token limit issues
+    if finish_reason == "length":
+        logger.warning(
+            f"⚠️  LLM hit model's maximum token limit for {task_type} - response may be incomplete")
+
+    if not content or content.strip() == "":
+        logger.warning(
+            f"⚠️  LLM returned empty response for {task_type} (finish_reason: {finish_reason})")
+        return ""
+
+    logger.info(
+        f"✅ LLM response received ({len(content)} chars, finish_reason: {finish_reason})")
+
+    # Log completion delimiter check; only extraction output ends
+    # with it, and only the tail needs scanning
+    if is_extraction and content.rfind(
+            COMPLETION_DELIMITER, max(0, len(content) - 64)) == -1:
+        logger.warning(
+            f"⚠️  LLM response missing completion delimiter for {task_type}")
+        logger.debug(f"🔍 Response preview: {content[:200]}...")
+
+    return content
+
+
+async def _request_embeddings(cfg: ClientConfig, texts: List[str]) -> List[np.ndarray]:
+    """Issue one embeddings API request"""
+    # Log embedding generation
+    total_chars = sum(len(text) for text in texts)
+    logger.info(
+        f"🔗 Generating embeddings for {len(texts)} text chunks ({total_chars} total chars)...")
+
+    if cfg.bucket is not None:
+        await cfg.bucket.acquire(total_chars // 4)
+
+    # base64 skips JSON float parsing and Python float boxing
+    async with cfg.sem:
+        response = await cfg.client.embeddings.create(
+            model=cfg.model,
+            input=texts,
+            encoding_format="base64",
+        )
+
+    logger.info(
+        f"✅ Embeddings generated ({len(response.data)} vectors)")
+    return [_decode_embedding(item.embedding) for item in response.data]
+
+
+async def azure_embedding_func(cfg: ClientConfig, texts: List[str]) -> np.ndarray:
+    """Azure embedding function; bind `cfg` with functools.partial"""
+    if not texts:
+        return np.empty((0, cfg.embedding_dim), dtype=np.float32)
+
+    # Resolve cached vectors up front (another call may evict them
+    # while this one awaits the API) and send each new text once
+    cache = cfg.cache
+    keys = [_embedding_key(text) for text in texts]
+    vectors = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in missing:
+            continue
+        vector = cache.get(key)
+        if vector is not None:
+            cache.move_to_end(key)
+            vectors[key] = vector
+        else:
+            missing[key] = text
+
+    if missing:
+        new_vectors = await cfg.coalescer.embed(list(missing.values()))
+        for key, vector in zip(missing, new_vectors):
+            vectors[key] = cache[key] = vector
+
+        while len(cache) > EMBEDDING_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        logger.info(
+            f"♻️  Reusing cached embeddings for {len(texts)} text chunks")
+
+    embeddings = np.empty(
+        (len(texts), len(vectors[keys[0]])), dtype=np.float32)
+    for row, key in enumerate(keys):
+        embeddings[row] = vectors[key]
+    return embeddings
+
+
+class LightRAGClient:
+    """Enhanced LightRAG client with optimized configuration"""
+
+    __slots__ = (
+        "working_dir", "rag",
+        "completed_ids_file", "_completed_ids", "_pending_ids",
+        "_checkpoint_interval", "_checkpoint_lock",
+        "_batch_timeout", "_drains",
+        "_llm_config", "_embed_config",
+        "llm_func", "embedding_func",
+    )
+
+    def __init__(self, working_dir: str, completed_ids_flush_interval: int = 1,
+                 batch_timeout: Optional[float] = None):
+        """Initialize LightRAG client
+
+        Args:
+            working_dir: LightRAG working directory
+            completed_ids_flush_interval: Inserted product ids buffered before each
+                append to the completed-ids checkpoint
+            batch_timeout: Upper bound in seconds on how long a batch insert
+                waits for its documents (defaults to INSERT_TIMEOUT_SECONDS)
+        """
+        self.working_dir = working_dir
+        self.rag: Optional[LightRAG] = None
+
+        # Completed products survive restarts so they are not re-inserted
+        self.completed_ids_file = os.path.join(working_dir, COMPLETED_IDS_FILE)
+        self._completed_ids: Set[str] = self._load_completed_ids()
+        self._pending_ids: List[str] = []
+        self._checkpoint_interval = max(1, completed_ids_flush_interval)
+        self._checkpoint_lock = asyncio.Lock()
+        self._batch_timeout = batch_timeout or INSERT_TIMEOUT_SECONDS
+        # Pipeline runs started by batch inserts; they drain every batch's
+        # documents, so they outlive the call that started them
+        self._drains: Set[asyncio.Task] = set()
+
+        # Build the API clients once so every call reuses their connections;
+        # both share one in-flight cap but get separate rate-limit buckets
+        # so chat and embedding deployments don't contend
+        sem = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self._llm_config = _build_config(
+            "LLM_BINDING_API_KEY", "AZURE_OPENAI_API_VERSION",
+            "LLM_BINDING_HOST", "AZURE_OPENAI_DEPLOYMENT",
+            sem, _make_bucket(AZURE_TPM, AZURE_RPM))
+        self._embed_config = _build_config(
+            "AZURE_EMBEDDING_API_KEY", "AZURE_EMBEDDING_API_VERSION",
+            "AZURE_EMBEDDING_ENDPOINT", "AZURE_EMBEDDING_DEPLOYMENT",
+            sem, _make_bucket(AZURE_EMBEDDING_TPM, AZURE_EMBEDDING_RPM),
+            embedding_dim=int(os.getenv("EMBEDDING_DIM", 1536)))
+        self._embed_config.coalescer = _EmbeddingCoalescer(
+            functools.partial(_request_embeddings, self._embed_config))
+
+        # LLM and embedding functions bound to this client's configuration
+        self.llm_func = functools.partial(azure_openai_llm_func, self._llm_config)
+        self.embedding_func = functools.partial(azure_embedding_func, self._embed_config)
 
     async def initialize(self) -> LightRAG:
         """Initialize LightRAG instance with optimized configuration"""
@@ -130,7 +470,7 @@ class LightRAGClient:
 
         # Create embedding function instance
         embedding_func_instance = EmbeddingFunc(
-            embedding_dim=int(os.getenv("EMBEDDING_DIM", 1536)),
+            embedding_dim=self._embed_config.embedding_dim,
             max_token_size=8192,
             func=self.embedding_func,
         )
@@ -214,6 +554,54 @@ class LightRAGClient:
         logger.info(
             f"✅ Enhanced vector storages with {len(product_meta_fields)} minimal product fields (product_id, weburl)")
 
+    def _load_completed_ids(self) -> Set[str]:
+        """Load the ids of products inserted by previous runs"""
+        try:
+            with open(self.completed_ids_file, 'r') as f:
+                completed = set(f.read().split())
+        except FileNotFoundError:
+            return set()
+        except OSError as e:
+            logger.warning(f"Could not load ingested product ids: {e}")
+            return set()
+
+        if completed:
+            logger.info(
+                f"♻️  {len(completed)} previously ingested products will be skipped")
+        return completed
+
+    async def _record_completed(self, product_id: str):
+        """Remember an inserted product, checkpointing every completed_ids_flush_interval ids"""
+        self._completed_ids.add(product_id)
+        self._pending_ids.append(product_id)
+        if len(self._pending_ids) >= self._checkpoint_interval:
+            await self.flush_completed()
+
+    async def flush_completed(self):
+        """Append buffered product ids to the checkpoint file and fsync it"""
+        async with self._checkpoint_lock:
+            if not self._pending_ids:
+                return
+            ids, self._pending_ids = self._pending_ids, []
+            try:
+                os.makedirs(self.working_dir, exist_ok=True)
+                async with aiofiles.open(self.completed_ids_file, 'a') as f:
+                    await f.write("".join(f"{product_id}\n" for product_id in ids))
+                    await f.flush()
+                    await asyncio.to_thread(os.fsync, f.fileno())
+            except OSError as e:
+                logger.warning(f"Could not save ingested product ids: {e}")
+
+    def clear_completed(self):
+        """Forget completed products so the next run inserts everything again"""
+        self._completed_ids.clear()
+        self._pending_ids.clear()
+        try:
+            if os.path.exists(self.completed_ids_file):
+                os.remove(self.completed_ids_file)
+        except OSError as e:
+            logger.warning(f"Could not remove ingested product ids: {e}")
+
     async def insert_text(self, text: str) -> bool:
         """Insert text into LightRAG (async)"""
         return await self.insert_text_with_source(text, "product_ingestion")
@@ -223,6 +611,10 @@ class LightRAGClient:
         if not self.rag:
             raise ValueError("RAG not initialized. Call initialize() first.")
 
+        if product_id and product_id in self._completed_ids:
+            logger.info(f"⏭️  Skipping product {product_id} - already ingested")
+            return True
+
         import time
         start_time = time.time()
 
@@ -238,35 +630,21 @@ class LightRAGClient:
                 logger.info(f"   📂 Category: {category}")
             logger.info(f"{'='*80}")
 
-            # Build enhanced file path with metadata
-            if product_id and category:
-                enhanced_file_path = f"product_id:{product_id}:category:{category}:source:{source_name}"
-            elif product_id:
-                enhanced_file_path = f"product_id:{product_id}:source:{source_name}"
-            else:
-                enhanced_file_path = source_name
+            enhanced_file_path, metadata = self._build_document(
+                source_name, product_id, category, product_metadata)
 
-            # Add timeout protection to prevent hanging
-            import asyncio
+            # Add timeout protection to prevent hanging; a timeout only
+            # loses this product, earlier ones are already checkpointed
             try:
-                # 10 minute timeout for small batches (was 5 minutes)
-                timeout_seconds = 600  # 10 minutes
+                timeout_seconds = INSERT_TIMEOUT_SECONDS
                 logger.info(
                     f"   ⏰ Timeout set to {timeout_seconds//60} minutes")
 
-                # Prepare metadata for LightRAG
-                metadata = {}
-                if product_metadata:
-                    metadata.update(product_metadata)
-                if product_id:
-                    metadata["product_id"] = product_id
-                if category:
-                    metadata["category"] = category
-
                 logger.info(f"\n🧠 STARTING LLM PROCESSING")
                 logger.info(
                     f"   ⚡ Entity extraction → Relationship extraction → Embeddings")
-                logger.info(f"   📊 Metadata fields: {len(metadata)} injected")
+                logger.info(
+                    f"   📊 Metadata fields: {len(metadata) if metadata else 0} injected")
 
                 # Use document pipeline for WebUI integration
                 track_id = f"products_{int(start_time)}"
@@ -277,7 +655,7 @@ class LightRAGClient:
                     ids=[product_id] if product_id else None,
                     file_paths=[enhanced_file_path],
                     track_id=track_id,
-                    metadata=metadata if metadata else None
+                    metadata=metadata
                 )
 
                 # Then process it with timeout
@@ -294,6 +672,9 @@ class LightRAGClient:
                 raise Exception(
                     f"LLM processing timeout after {timeout_seconds//60} minutes - text too large for efficient processing")
 
+            if product_id:
+                await self._record_completed(product_id)
+
             end_time = time.time()
             duration = end_time - start_time
 
@@ -312,13 +693,154 @@ class LightRAGClient:
             logger.error(f"❌ Failed to insert text: {e}")
             return False
 
+    async def insert_texts_with_sources(self, documents: List[Tuple], batch_id: int) -> List[str]:
+        """Insert a batch of products with a single pipeline run
+
+        Every product is enqueued first and the LightRAG pipeline is then
+        drained, so entity extraction and embedding of different products
+        overlap instead of running one product at a time. Batches run
+        concurrently and share one pipeline: a drain request made while
+        another batch's run is busy returns at once and leaves the work to
+        that run. Completion is therefore judged from this batch's own
+        document statuses, polled until none is pending or processing or
+        the batch deadline passes. Products whose document status is
+        PROCESSED are checkpointed, the rest reported.
+
+        Args:
+            documents: (text, source_name, product_id, category, product_metadata)
+                tuples, as accepted by insert_text_with_source
+            batch_id: Batch number, used for the tracking id
+
+        Returns:
+            Product ids (source names for products without one) that were
+            not ingested
+        """
+        if not self.rag:
+            raise ValueError("RAG not initialized. Call initialize() first.")
+
+        pending = [doc for doc in documents
+                   if not (doc[2] and doc[2] in self._completed_ids)]
+        skipped = len(documents) - len(pending)
+        if skipped:
+            logger.info(f"⏭️  Skipping {skipped} already ingested products")
+        if not pending:
+            return []
+
+        import time
+        start_time = time.time()
+        track_id = f"products_{batch_id}_{int(start_time)}"
+
+        doc_ids = []
+        for text, source_name, product_id, category, product_metadata in pending:
+            file_path, metadata = self._build_document(
+                source_name, product_id, category, product_metadata)
+            await self.rag.apipeline_enqueue_documents(
+                input=text,
+                ids=[product_id] if product_id else None,
+                file_paths=[file_path],
+                track_id=track_id,
+                metadata=metadata
+            )
+            # Without an explicit id LightRAG keys the document by content hash
+            doc_ids.append(product_id or compute_mdhash_id(
+                sanitize_text_for_encoding(text), prefix="doc-"))
+
+        # The pipeline runs documents in parallel, so the per-product
+        # timeout bounds the whole run, capped by the batch timeout
+        timeout_seconds = min(INSERT_TIMEOUT_SECONDS * len(pending),
+                              self._batch_timeout)
+        deadline = asyncio.get_running_loop().time() + timeout_seconds
+        logger.info(
+            f"🧠 Processing {len(pending)} enqueued products (timeout {timeout_seconds//60} minutes)")
+
+        # The drain may be processing other batches' documents too, so it
+        # runs as its own task and is never cancelled on this batch's behalf
+        drain = asyncio.ensure_future(
+            self.rag.apipeline_process_enqueue_documents())
+        self._drains.add(drain)
+        drain.add_done_callback(self._drain_done)
+        await asyncio.wait({drain}, timeout=timeout_seconds)
+
+        statuses = await self._wait_for_documents(doc_ids, deadline)
+
+        # Barrier: checkpoint only products LightRAG reports as processed
+        failed = []
+        unfinished = 0
+        for doc, doc_id in zip(pending, doc_ids):
+            status = statuses.get(doc_id)
+            state = status.get("status") if status else None
+            if state == DocStatus.PROCESSED:
+                if doc[2]:
+                    await self._record_completed(doc[2])
+                continue
+            if state in _UNFINISHED_STATES:
+                unfinished += 1
+            failed.append(doc[2] or doc[1])
+        if unfinished:
+            logger.error(
+                f"⏰ Batch {batch_id}: {unfinished} products still unfinished after {timeout_seconds//60} minutes")
+
+        duration = time.time() - start_time
+        logger.info(
+            f"🎉 Batch {batch_id}: {len(pending) - len(failed)}/{len(pending)} products ingested in {duration:.1f}s")
+        return failed
+
+    async def _wait_for_documents(self, doc_ids: List[str], deadline: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Poll document statuses until none is pending/processing or the deadline passes
+
+        Statuses are fetched one id at a time and keyed by doc id: the
+        storages' get_by_ids neither keeps input order (Mongo $in, PG ANY)
+        nor returns a row for missing ids (JSON), so rows cannot be zipped
+        back onto the ids.
+        """
+        loop = asyncio.get_running_loop()
+        doc_status = self.rag.doc_status
+        while True:
+            rows = await asyncio.gather(
+                *(doc_status.get_by_id(doc_id) for doc_id in doc_ids))
+            statuses = dict(zip(doc_ids, rows))
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not any(
+                    status and status.get("status") in _UNFINISHED_STATES
+                    for status in rows):
+                return statuses
+            await asyncio.sleep(min(INSERT_POLL_INTERVAL, remaining))
+
+    def _drain_done(self, task: asyncio.Task):
+        """Forget a finished pipeline run, logging its failure"""
+        self._drains.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ LightRAG pipeline run failed: {task.exception()}")
+
+    @staticmethod
+    def _build_document(source_name: str, product_id: str = None, category: str = None,
+                        product_metadata: dict = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Build the enhanced file path and LightRAG metadata for a product"""
+        if product_id and category:
+            file_path = f"product_id:{product_id}:category:{category}:source:{source_name}"
+        elif product_id:
+            file_path = f"product_id:{product_id}:source:{source_name}"
+        else:
+            file_path = source_name
+
+        metadata = {}
+        if product_metadata:
+            metadata.update(product_metadata)
+        if product_id:
+            metadata["product_id"] = product_id
+        if category:
+            metadata["category"] = category
+        return file_path, metadata or None
+
     async def query_rfp(self, requirements: str, **kwargs) -> str:
         """Query for RFP generation using hybrid mode"""
         if not self.rag:
             raise ValueError("RAG not initialized. Call initialize() first.")
 
-        # Use hybrid mode for complex reasoning
-        result = self.rag.query(
+        # Use hybrid mode for complex reasoning; aquery keeps the event loop
+        # free (query() would block it by running its own loop to completion)
+        result = await self.rag.aquery(
             requirements,
             param=QueryParam(mode="hybrid", **kwargs)
         )
@@ -330,7 +852,7 @@ class LightRAGClient:
             raise ValueError("RAG not initialized. Call initialize() first.")
 
         # Use local mode for semantic similarity
-        result = self.rag.query(
+        result = await self.rag.aquery(
             query,
             param=QueryParam(mode="local", **kwargs)
         )
@@ -341,12 +863,22 @@ class LightRAGClient:
         if not self.rag:
             raise ValueError("RAG not initialized. Call initialize() first.")
 
-        result = self.rag.query(
+        result = await self.rag.aquery(
             query,
             param=QueryParam(mode=mode, **kwargs)
         )
         return result
 
+    async def aclose(self):
+        """Stop pipeline runs, flush the completed-ids checkpoint and close the API clients"""
+        drains = list(self._drains)
+        for drain in drains:
+            drain.cancel()
+        await asyncio.gather(*drains, return_exceptions=True)
+        await self.flush_completed()
+        await self._llm_config.client.close()
+        await self._embed_config.client.close()
+
     def get_stats(self) -> dict:
         """Get basic statistics about the RAG instance"""
         if not self.rag:
@@ -0,0 +1,105 @@
+"""Process-wide MongoDB connection pools for product ingestion"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+from pymongo import AsyncMongoClient, MongoClient
+import certifi
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+# AsyncMongoClient is bound to the event loop it first runs on, so there is
+# one per loop (the API server's loop, each asyncio.run of a script)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncMongoClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _client_options() -> Dict[str, Any]:
+    """Connection URI and pool settings shared by the sync and async clients"""
+    product_mongo_uri = os.getenv("PRODUCT_MONGO_URI")
+    if not product_mongo_uri:
+        raise ValueError(
+            "PRODUCT_MONGO_URI environment variable is required")
+
+    return dict(
+        host=product_mongo_uri,
+        tlsCAFile=certifi.where(),
+        # One pool shared by all ingestion jobs and route handlers
+        maxPoolSize=200,
+        minPoolSize=10,
+        maxIdleTimeMS=300000,  # Keep idle connections for 5 minutes
+        # Timeout configurations
+        serverSelectionTimeoutMS=5000,  # 5s server selection timeout
+        connectTimeoutMS=10000,  # 10s connection timeout
+        socketTimeoutMS=30000,   # 30s socket timeout
+        # Read preferences for better performance
+        readPreference='secondaryPreferred',  # Prefer secondary for reads
+        # Write concern for reliability
+        w='majority',  # Wait for majority acknowledgment
+        # Compression for better network performance
+        compressors='zstd,zlib,snappy'
+    )
+
+
+def get_mongo_client() -> MongoClient:
+    """
+    Return the shared product MongoDB client, creating it on first use
+
+    Every MongoDBClient (and so every ProductIngestionService) draws
+    connections from this one pool instead of opening its own.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(**_client_options())
+            logger.info("🔌 Created shared product MongoDB connection pool")
+    return _client
+
+
+def get_async_mongo_client() -> AsyncMongoClient:
+    """
+    Return the shared asyncio product MongoDB client for the running event loop
+
+    Must be called from a coroutine; all MongoDBClient instances on the
+    same loop share its pool.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = AsyncMongoClient(**_client_options())
+            logger.info("🔌 Created shared async product MongoDB connection pool")
+    return client
+
+
+def close_mongo_client():
+    """Close the shared pool (on application shutdown)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            logger.info("📴 Shared product MongoDB connection pool closed")
+
+
+async def close_async_mongo_client():
+    """Close the running event loop's async pool (on application shutdown)"""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+        logger.info("📴 Shared async product MongoDB connection pool closed")
@@ -1,45 +1,37 @@
 """Enhanced MongoDB client for product data access"""
 
 import os
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING
+from pymongo.asynchronous.cursor import AsyncCursor
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
-import certifi
+
+from .mongo_pool import get_mongo_client, get_async_mongo_client
 
 logger = logging.getLogger(__name__)
 
 
 class MongoDBClient:
-    """Enhanced MongoDB client with connection pooling and optimizations for Zoftware database"""
+    """
+    Enhanced MongoDB client with connection pooling and optimizations for Zoftware database
+
+    Product queries are coroutines on the shared asyncio client, so they
+    never block the event loop; `client` is the sync pool, kept for the
+    name resolvers that run in worker threads.
+    """
 
     def __init__(self):
-        """Initialize MongoDB client with enhanced configuration"""
+        """Initialize MongoDB client on the shared connection pool"""
         self.product_mongo_uri = os.getenv("PRODUCT_MONGO_URI")
         if not self.product_mongo_uri:
             raise ValueError(
                 "PRODUCT_MONGO_URI environment variable is required")
 
-        # Enhanced connection configuration for production workloads
-        self.client = MongoClient(
-            self.product_mongo_uri,
-            tlsCAFile=certifi.where(),
-            # Connection pooling for better performance
-            maxPoolSize=20,  # Max connections in pool
-            minPoolSize=5,   # Min connections to maintain
-            maxIdleTimeMS=30000,  # Close connections after 30s idle
-            # Timeout configurations
-            serverSelectionTimeoutMS=5000,  # 5s server selection timeout
-            connectTimeoutMS=10000,  # 10s connection timeout
-            socketTimeoutMS=30000,   # 30s socket timeout
-            # Read preferences for better performance
-            readPreference='secondaryPreferred',  # Prefer secondary for reads
-            # Write concern for reliability
-            w='majority',  # Wait for majority acknowledgment
-            # Compression for better network performance
-            compressors='zstd,zlib,snappy'
-        )
+        # All instances share one pooled client (see mongo_pool)
+        self.client = get_mongo_client()
 
         # Cache frequently used database and collection references
         self._db_cache = {}
@@ -82,16 +74,79 @@ class MongoDBClient:
             self._db_cache[database] = self.client[database]
         return self._db_cache[database]
 
-    def fetch_products(self,
-                       database: str = "Zoftware",
-                       collection: str = "Products",
-                       filter_query: Optional[Dict[str, Any]] = None,
-                       limit: Optional[int] = None,
-                       skip: int = 0,
-                       sort_field: Optional[str] = None,
-                       sort_direction: int = 1,
-                       projection: Optional[Dict[str, int]] = None,
-                       batch_size: int = 1000) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _get_async_collection(database: str, collection: str):
+        """Collection on the running event loop's async client"""
+        return get_async_mongo_client()[database][collection]
+
+    @staticmethod
+    def _build_query(filter_query: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Product filter, defaulting to active products only"""
+        # Default to active products only if no specific filter provided
+        return filter_query or {'is_active': True}
+
+    def fetch_products_cursor(self,
+                              database: str = "Zoftware",
+                              collection: str = "Products",
+                              filter_query: Optional[Dict[str, Any]] = None,
+                              limit: Optional[int] = None,
+                              skip: int = 0,
+                              sort_field: Optional[str] = None,
+                              sort_direction: int = 1,
+                              projection: Optional[Dict[str, int]] = None,
+                              batch_size: int = 1000) -> AsyncCursor:
+        """
+        Open a cursor over products without reading it
+
+        Takes the same arguments as fetch_products; callers that stream
+        (ingestion) iterate the cursor themselves and must close it.
+        """
+        coll = self._get_async_collection(database, collection)
+
+        # Create cursor with projection for better performance
+        cursor = coll.find(self._build_query(filter_query), projection)
+
+        # Apply sorting with index hints for common patterns
+        if sort_field:
+            cursor = cursor.sort(sort_field, sort_direction)
+        # Remove default sort to avoid memory limit issues with large collections
+        # For large datasets, natural order is more efficient
+
+        # Apply pagination efficiently
+        if skip > 0:
+            cursor = cursor.skip(skip)
+
+        if limit:
+            cursor = cursor.limit(limit)
+
+        # Set batch size for efficient network usage
+        return cursor.batch_size(batch_size)
+
+    async def count_products(self,
+                             database: str = "Zoftware",
+                             collection: str = "Products",
+                             filter_query: Optional[Dict[str, Any]] = None,
+                             limit: Optional[int] = None,
+                             skip: int = 0) -> int:
+        """Count the products fetch_products would return for the same arguments"""
+        options = {}
+        if skip > 0:
+            options['skip'] = skip
+        if limit:
+            options['limit'] = limit
+        coll = self._get_async_collection(database, collection)
+        return await coll.count_documents(self._build_query(filter_query), **options)
+
+    async def fetch_products(self,
+                             database: str = "Zoftware",
+                             collection: str = "Products",
+                             filter_query: Optional[Dict[str, Any]] = None,
+                             limit: Optional[int] = None,
+                             skip: int = 0,
+                             sort_field: Optional[str] = None,
+                             sort_direction: int = 1,
+                             projection: Optional[Dict[str, int]] = None,
+                             batch_size: int = 1000) -> List[Dict[str, Any]]:
         """
         Enhanced product fetching with optimizations for large datasets
 
@@ -110,41 +165,16 @@ class MongoDBClient:
             List of product documents
         """
         try:
-            db = self._get_database(database)
-            coll = db[collection]
-
-            # Build optimized query with default filters for active products
-            query = filter_query or {}
-
-            # Default to active products only if no specific filter provided
-            if not filter_query:
-                query = {'is_active': True}
-
-            # Create cursor with projection for better performance
-            cursor = coll.find(query, projection)
-
-            # Apply sorting with index hints for common patterns
-            if sort_field:
-                cursor = cursor.sort(sort_field, sort_direction)
-            # Remove default sort to avoid memory limit issues with large collections
-            # For large datasets, natural order is more efficient
-
-            # Apply pagination efficiently
-            if skip > 0:
-                cursor = cursor.skip(skip)
-
-            if limit:
-                cursor = cursor.limit(limit)
-
-            # Set batch size for efficient network usage
-            cursor = cursor.batch_size(batch_size)
+            cursor = self.fetch_products_cursor(
+                database, collection, filter_query, limit, skip,
+                sort_field, sort_direction, projection, batch_size)
 
             # Execute query with progress tracking for large datasets
             products = []
             processed = 0
 
             try:
-                for doc in cursor:
+                async for doc in cursor:
                     products.append(doc)
                     processed += 1
 
@@ -172,8 +202,8 @@ class MongoDBClient:
             logger.error(f"❌ Error fetching products: {e}")
             raise
 
-    def get_collection_stats(self, database: str = "Zoftware", collection: str = "Products",
-                             use_cache: bool = True, cache_ttl_minutes: int = 30) -> Dict[str, Any]:
+    async def get_collection_stats(self, database: str = "Zoftware", collection: str = "Products",
+                                   use_cache: bool = True, cache_ttl_minutes: int = 30) -> Dict[str, Any]:
         """Get comprehensive collection statistics with caching"""
         cache_key = f"{database}.{collection}"
 
@@ -184,23 +214,26 @@ class MongoDBClient:
                 return self._stats_cache[cache_key]
 
         try:
-            db = self._get_database(database)
-            coll = db[collection]
-
-            # Get comprehensive statistics
-            stats = {
-                'total_documents': coll.count_documents({}),
-                'active_products': coll.count_documents({'is_active': True}),
-                'verified_products': coll.count_documents({'admin_verified': True}),
-                'with_ratings': coll.count_documents({'ratings.total_reviews': {'$gt': 0}}),
-                'with_integrations': coll.count_documents({'integrations': {'$exists': True, '$ne': []}}),
-                'with_pricing': coll.count_documents({'pricing': {'$exists': True, '$ne': []}}),
-                'recently_updated': coll.count_documents({
+            coll = self._get_async_collection(database, collection)
+
+            # Get comprehensive statistics; the counts run concurrently
+            count_filters = {
+                'total_documents': {},
+                'active_products': {'is_active': True},
+                'verified_products': {'admin_verified': True},
+                'with_ratings': {'ratings.total_reviews': {'$gt': 0}},
+                'with_integrations': {'integrations': {'$exists': True, '$ne': []}},
+                'with_pricing': {'pricing': {'$exists': True, '$ne': []}},
+                'recently_updated': {
                     'updated_on': {'$gte': datetime.now() - timedelta(days=30)}
-                }),
-                # Rough estimate
-                'collection_size_mb': round(coll.estimated_document_count() * 0.005, 2)
+                },
             }
+            counts = await asyncio.gather(
+                *(coll.count_documents(query) for query in count_filters.values()),
+                coll.estimated_document_count())
+            stats = dict(zip(count_filters, counts))
+            # Rough estimate
+            stats['collection_size_mb'] = round(counts[-1] * 0.005, 2)
 
             # Add distribution analysis
             try:
@@ -212,8 +245,8 @@ class MongoDBClient:
                     {'$sort': {'count': -1}},
                     {'$limit': 10}
                 ]
-                top_categories = list(coll.aggregate(
-                    category_pipeline, maxTimeMS=10000))
+                cursor = await coll.aggregate(category_pipeline, maxTimeMS=10000)
+                top_categories = await cursor.to_list()
                 stats['top_categories'] = {
                     str(cat['_id']): cat['count'] for cat in top_categories}
 
@@ -235,15 +268,15 @@ class MongoDBClient:
             logger.error(f"❌ Error getting collection stats: {e}")
             return {}
 
-    def get_sample_products(self, database: str = "Zoftware", collection: str = "Products",
-                            count: int = 3, filter_query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    async def get_sample_products(self, database: str = "Zoftware", collection: str = "Products",
+                                  count: int = 3, filter_query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Get multiple sample products for testing and validation"""
         try:
             # Get diverse samples by using different sort orders
             samples = []
 
             # Get products without sorting to avoid memory issues
-            recent_products = self.fetch_products(
+            recent_products = await self.fetch_products(
                 database, collection,
                 filter_query=filter_query or {'is_active': True},
                 limit=count//3 + 1
@@ -253,7 +286,7 @@ class MongoDBClient:
 
             # Get highest rated products
             if len(samples) < count:
-                rated_products = self.fetch_products(
+                rated_products = await self.fetch_products(
                     database, collection,
                     filter_query={**(filter_query or {}),
                                   'ratings.overall_rating': {'$gte': 4.0}},
@@ -265,7 +298,7 @@ class MongoDBClient:
             # Fill remaining with random products if needed
             if len(samples) < count:
                 remaining = count - len(samples)
-                random_products = self.fetch_products(
+                random_products = await self.fetch_products(
                     database, collection,
                     filter_query=filter_query or {'is_active': True},
                     limit=remaining,
@@ -291,14 +324,14 @@ class MongoDBClient:
             logger.error(f"❌ Error getting sample products: {e}")
             return []
 
-    def get_sample_product(self, database: str = "Zoftware", collection: str = "Products") -> Optional[Dict[str, Any]]:
+    async def get_sample_product(self, database: str = "Zoftware", collection: str = "Products") -> Optional[Dict[str, Any]]:
         """Get a single sample product for testing and validation"""
-        samples = self.get_sample_products(database, collection, count=1)
+        samples = await self.get_sample_products(database, collection, count=1)
         return samples[0] if samples else None
 
-    def fetch_products_by_category(self, category_ids: List[str],
-                                   database: str = "Zoftware", collection: str = "Products",
-                                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def fetch_products_by_category(self, category_ids: List[str],
+                                         database: str = "Zoftware", collection: str = "Products",
+                                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Fetch products by specific category IDs"""
         try:
             # Convert string IDs to ObjectId format if needed
@@ -318,7 +351,7 @@ class MongoDBClient:
                 'category': {'$in': category_filter}
             }
 
-            return self.fetch_products(
+            return await self.fetch_products(
                 database=database,
                 collection=collection,
                 filter_query=filter_query,
@@ -329,9 +362,9 @@ class MongoDBClient:
             logger.error(f"❌ Error fetching products by category: {e}")
             return []
 
-    def fetch_products_with_ratings(self, min_rating: float = 3.0,
-                                    database: str = "Zoftware", collection: str = "Products",
-                                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def fetch_products_with_ratings(self, min_rating: float = 3.0,
+                                          database: str = "Zoftware", collection: str = "Products",
+                                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Fetch products with minimum rating threshold"""
         try:
             filter_query = {
@@ -340,7 +373,7 @@ class MongoDBClient:
                 'ratings.total_reviews': {'$gt': 0}
             }
 
-            return self.fetch_products(
+            return await self.fetch_products(
                 database=database,
                 collection=collection,
                 filter_query=filter_query,
@@ -375,8 +408,8 @@ class MongoDBClient:
         logger.info("🗑️ MongoDB client cache cleared")
 
     def close(self):
-        """Close the MongoDB connection and clear caches"""
+        """Release this client's caches; the shared pool stays open for other users"""
         if self.client:
             self.clear_cache()
-            self.client.close()
-            logger.info("📴 MongoDB connection closed")
+            self.client = None
+            logger.info("📴 MongoDB client released")
@@ -2,19 +2,83 @@
 
 import logging
 import asyncio
-import json
+import gc
 import os
-from typing import Dict, List, Any, Optional
+import aiofiles
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from pymongo.asynchronous.cursor import AsyncCursor
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential_jitter
+
+from lightrag.utils import get_env_value
 
 from ..models.config import IngestionConfig
 from ..clients.mongodb_client import MongoDBClient
+from ..clients.mongo_pool import close_async_mongo_client
 from ..clients.lightrag_client import LightRAGClient
+from ..extractors.metadata_extractor import PRODUCT_PROJECTION
 from ..processors.batch_processor import BatchProcessor
 from ..monitoring.pipeline_integration import get_pipeline_integrator
+from ..utils.serialization import json_dumps, json_loads
+
+try:
+    import psutil
+except ImportError:
+    # Without psutil the periodic collection runs unconditionally
+    psutil = None
 
 logger = logging.getLogger(__name__)
 
+# Errors copied into the final results; the rest are only counted
+MAX_SAMPLE_ERRORS = 10
+
+
+def _estimate_tokens(product: Dict[str, Any]) -> int:
+    """Rough LLM token count of a product's free text (4 chars per token)"""
+    text_chars = 0
+    for field in ('description', 'overview', 'usp'):
+        value = product.get(field)
+        if isinstance(value, str):
+            text_chars += len(value)
+    return text_chars // 4
+
+
+def _rss_mb() -> Optional[int]:
+    """Resident set size of this process in MB, or None without psutil"""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss >> 20
+
+
+async def _batched(cursor: AsyncCursor, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield lists of `size` documents from a MongoDB cursor"""
+    try:
+        while True:
+            batch = await cursor.to_list(size)
+            if not batch:
+                return
+            yield batch
+    finally:
+        await cursor.close()
+
+
+async def _aiter(batches: List[List[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Async iterator over already planned batches"""
+    for batch in batches:
+        yield batch
+
+
+async def _write_json_atomic(path: str, data: Dict[str, Any]):
+    """Write JSON so a crash leaves either the old or the new file, never a torn one"""
+    payload = json_dumps(data, indent=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    async with aiofiles.open(tmp_path, 'wb') as f:
+        await f.write(payload)
+        await f.flush()
+        await asyncio.to_thread(os.fsync, f.fileno())
+    os.replace(tmp_path, path)
+
 
 class ProductIngestionService:
     """
@@ -29,23 +93,42 @@ class ProductIngestionService:
     - Retry logic and resume capability
     """
 
+    # Services not yet cleaned up. Jobs on the API server share its event
+    # loop's async MongoDB pool, so only the last one out closes it
+    _open_services = 0
+
     def __init__(self, config: IngestionConfig = None):
         """Initialize the ingestion service with all components"""
-        self.config = config or IngestionConfig()
+        if config is None:
+            config = IngestionConfig.autotune() if get_env_value(
+                "LIGHTRAG_AUTOTUNE", False, bool) else IngestionConfig()
+        self.config = config
 
         # Initialize clients
         self.mongodb_client = MongoDBClient()
-        self.lightrag_client = LightRAGClient(self.config.working_dir)
+        self.lightrag_client = LightRAGClient(
+            self.config.working_dir,
+            completed_ids_flush_interval=self.config.completed_ids_flush_interval,
+            batch_timeout=self.config.batch_timeout_minutes * 60)
 
         # Initialize processor with database connection for name resolution
         self.batch_processor = BatchProcessor(
-            self.lightrag_client, self.mongodb_client.client.get_database('Zoftware'))
+            self.lightrag_client,
+            self.mongodb_client.client.get_database('Zoftware'),
+            concurrency=self.config.product_concurrency,
+            process_pool_min_batch=self.config.process_pool_min_batch)
 
         # Progress tracking
         self.progress_file = os.path.join(
             self.config.working_dir, "ingestion_progress.json")
         self.checkpoint_file = os.path.join(
             self.config.working_dir, "ingestion_checkpoint.json")
+        self.batch_details_file = os.path.join(
+            self.config.working_dir, "ingestion_batch_results.jsonl")
+        # Serializes state-file writes from concurrent batch consumers
+        self._state_lock = asyncio.Lock()
+        ProductIngestionService._open_services += 1
+        self._cleaned_up = False
 
         logger.info(f"🚀 ProductIngestionService initialized")
         logger.info(f"   Working directory: {self.config.working_dir}")
@@ -60,45 +143,55 @@ class ProductIngestionService:
         await self.lightrag_client.initialize()
         logger.info("✅ LightRAG initialized successfully")
 
-    def get_collection_stats(self, database: str, collection: str) -> Dict[str, Any]:
+        # Name lookups for the whole run come from memory, not per-batch queries
+        await self.batch_processor.metadata_extractor.preload_resolvers()
+
+    async def get_collection_stats(self, database: str, collection: str) -> Dict[str, Any]:
         """Get collection statistics"""
-        return self.mongodb_client.get_collection_stats(database, collection)
+        return await self.mongodb_client.get_collection_stats(database, collection)
 
     def _load_progress(self) -> Dict[str, Any]:
         """Load progress from file"""
         if os.path.exists(self.progress_file):
             try:
-                with open(self.progress_file, 'r') as f:
-                    return json.load(f)
+                with open(self.progress_file, 'rb') as f:
+                    return json_loads(f.read())
             except Exception as e:
                 logger.warning(f"Could not load progress file: {e}")
         return {"completed_batches": 0, "total_batches": 0, "start_time": None}
 
-    def _save_progress(self, progress: Dict[str, Any]):
-        """Save progress to file"""
+    async def _save_progress(self, progress: Dict[str, Any]):
+        """Save progress to file atomically"""
         try:
-            os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
-            with open(self.progress_file, 'w') as f:
-                json.dump(progress, f, indent=2)
+            async with self._state_lock:
+                await _write_json_atomic(self.progress_file, progress)
         except Exception as e:
             logger.warning(f"Could not save progress: {e}")
 
+    async def _append_batch_details(self, result: Dict[str, Any]):
+        """Append one batch result to the JSONL details file"""
+        try:
+            async with self._state_lock:
+                async with aiofiles.open(self.batch_details_file, 'ab') as f:
+                    await f.write(json_dumps(result) + b"\n")
+        except Exception as e:
+            logger.warning(f"Could not write batch details: {e}")
+
     def _load_checkpoint(self) -> Dict[str, Any]:
         """Load checkpoint data"""
         if os.path.exists(self.checkpoint_file):
             try:
-                with open(self.checkpoint_file, 'r') as f:
-                    return json.load(f)
+                with open(self.checkpoint_file, 'rb') as f:
+                    return json_loads(f.read())
             except Exception as e:
                 logger.warning(f"Could not load checkpoint: {e}")
         return {}
 
-    def _save_checkpoint(self, checkpoint: Dict[str, Any]):
-        """Save checkpoint data"""
+    async def _save_checkpoint(self, checkpoint: Dict[str, Any]):
+        """Save checkpoint data atomically"""
         try:
-            os.makedirs(os.path.dirname(self.checkpoint_file), exist_ok=True)
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(checkpoint, f, indent=2)
+            async with self._state_lock:
+                await _write_json_atomic(self.checkpoint_file, checkpoint)
         except Exception as e:
             logger.warning(f"Could not save checkpoint: {e}")
 
@@ -126,6 +219,9 @@ class ProductIngestionService:
         progress = self._load_progress() if resume_from_checkpoint else {
             "completed_batches": 0, "total_batches": 0, "start_time": None}
 
+        if not resume_from_checkpoint:
+            self.lightrag_client.clear_completed()
+
         if progress.get("start_time") and resume_from_checkpoint:
             logger.info(
                 f"🔄 Resuming ingestion from batch {progress['completed_batches'] + 1}")
@@ -135,136 +231,174 @@ class ProductIngestionService:
                 f"🚀 Starting new product ingestion from {database}.{collection}")
             progress["start_time"] = start_time.isoformat()
 
-        # Fetch products
-        products = self.mongodb_client.fetch_products(
-            database, collection, filter_query, limit, skip
-        )
-
-        if not products:
+        # Determine starting batch
+        start_batch = progress.get(
+            "completed_batches", 0) + 1 if resume_from_checkpoint else 1
+        if progress.get("batch_target_tokens", 0) != self.config.batch_target_tokens:
+            if start_batch > 1:
+                logger.warning(
+                    "⚠️  Batch packing changed since the last run; starting from batch 1")
+                resume_from_checkpoint = False
+            start_batch = 1
+            progress["completed_batches"] = 0
+            progress["batch_target_tokens"] = self.config.batch_target_tokens
+
+        batch_size = self.config.batch_size
+        if self.config.batch_target_tokens <= 0:
+            # Fixed-size batches stream straight off the cursor, so only
+            # the batches in flight are held in memory
+            total_products = await self.mongodb_client.count_products(
+                database, collection, filter_query, limit, skip)
+            total_batches = -(-total_products // batch_size)
+
+            # Batches finished by a previous run are skipped on the server
+            done = (start_batch - 1) * batch_size
+            if done < total_products:
+                # Fetch products, transferring only the fields ingestion reads
+                cursor = self.mongodb_client.fetch_products_cursor(
+                    database, collection, filter_query,
+                    limit=total_products - done, skip=skip + done,
+                    projection=PRODUCT_PROJECTION, batch_size=batch_size)
+                batches = _batched(cursor, batch_size)
+            else:
+                batches = _aiter([])
+        else:
+            # Packing sorts by size, so it needs every product up front;
+            # packing is deterministic for the same products, so a resume
+            # with the same setting gets the same batches back
+            products = await self.mongodb_client.fetch_products(
+                database, collection, filter_query, limit, skip,
+                projection=PRODUCT_PROJECTION, batch_size=batch_size)
+            planned = self._plan_batches(products)
+            total_products = len(products)
+            total_batches = len(planned)
+            del products
+            done = sum(len(batch) for batch in planned[:start_batch - 1])
+            batches = _aiter(planned[start_batch - 1:])
+
+        if not total_products:
             logger.warning("No products found to ingest")
             return {"status": "completed", "total_products": 0}
 
-        # Calculate total batches
-        total_batches = (len(products) + self.config.batch_size -
-                         1) // self.config.batch_size
         progress["total_batches"] = total_batches
 
-        # Determine starting batch
-        start_batch = progress.get(
-            "completed_batches", 0) + 1 if resume_from_checkpoint else 1
-
-        logger.info(f"📊 Total products: {len(products)}")
+        logger.info(f"📊 Total products: {total_products}")
         logger.info(f"📊 Total batches: {total_batches}")
         logger.info(f"📊 Starting from batch: {start_batch}")
-        logger.info(f"📊 Batch size: {self.config.batch_size}")
+        logger.info(f"📊 Batch size: {batch_size}")
+
+        # A fresh run starts a fresh details file; a resumed one appends, and
+        # a re-run batch's later line supersedes its earlier one
+        if self.config.include_batch_details and start_batch == 1:
+            os.makedirs(self.config.working_dir, exist_ok=True)
+            open(self.batch_details_file, 'wb').close()
 
         # Load checkpoint data if resuming
         checkpoint_data = self._load_checkpoint() if resume_from_checkpoint else {}
-        batch_results = checkpoint_data.get("batch_results", [])
-
-        # Track consecutive failures
+        # One slot per batch, so results stay in batch order however the
+        # workers finish and a retried batch replaces its old result
+        results: List[Optional[Dict[str, Any]]] = [None] * total_batches
+        for result in checkpoint_data.get("batch_results", []):
+            batch_id = result.get("batch_id", 0)
+            if 0 < batch_id <= total_batches:
+                results[batch_id - 1] = result
+
+        # Producer/consumer pipeline: one producer queues batches, max_workers
+        # consumers process them, so several batches are in flight at once.
+        # The bounded queue double-buffers: the next batches are read from
+        # MongoDB while the current ones are in LightRAG, and memory stays
+        # at max_workers + prefetch_batches batches
+        workers = max(1, self.config.max_workers)
+        queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(1, self.config.prefetch_batches))
+        stop = asyncio.Event()
+        # Products fetched so far, counting those of batches finished by a
+        # previous run; the final stats use this instead of a product list
+        total_fetched = min(done, total_products)
+        finished_batches = set()
+        watermark = start_batch - 1
         consecutive_failures = 0
 
-        # Process batches with retry logic
-        for i in range(start_batch - 1, total_batches):
-            batch_id = i + 1
-            batch_start_idx = i * self.config.batch_size
-            batch = products[batch_start_idx:batch_start_idx +
-                             self.config.batch_size]
-
-            logger.info(
-                f"🔄 Processing batch {batch_id}/{total_batches} ({len(batch)} products)")
-
-            # Retry logic for individual batches
-            batch_success = False
-            for retry_attempt in range(self.config.max_retries):
+        async def produce():
+            nonlocal total_fetched
+            batch_id = start_batch
+            try:
+                async for batch in batches:
+                    if stop.is_set():
+                        break
+                    total_fetched += len(batch)
+                    await queue.put((batch_id, batch))
+                    batch_id += 1
+            finally:
+                # Release the cursor and let consumers exit even if reading failed
+                await batches.aclose()
+                for _ in range(workers):
+                    await queue.put(None)
+
+        async def consume():
+            nonlocal consecutive_failures, watermark
+            while True:
+                item = await queue.get()
                 try:
-                    # Set timeout for individual batch
-                    batch_timeout = self.config.batch_timeout_minutes * 60
-
-                    result = await asyncio.wait_for(
-                        self.batch_processor.process_batch(batch, batch_id),
-                        timeout=batch_timeout
-                    )
-
-                    batch_results.append(result)
-                    batch_success = True
-                    consecutive_failures = 0  # Reset failure counter
-
-                    # Update progress
-                    progress["completed_batches"] = batch_id
-                    self._save_progress(progress)
+                    if item is None:
+                        return
+                    if stop.is_set():
+                        continue  # keep draining so the producer never blocks
+
+                    batch_id, batch = item
+                    result, failed_attempts = await self._process_batch_with_retry(
+                        batch, batch_id, total_batches)
+                    results[batch_id - 1] = result
+                    if self.config.include_batch_details:
+                        await self._append_batch_details(result)
+
+                    # Track consecutive failures
+                    if failed_attempts < self.config.max_retries:
+                        consecutive_failures = 0
+                    else:
+                        consecutive_failures += failed_attempts
+                    if (consecutive_failures >= self.config.max_consecutive_failures
+                            and not stop.is_set()):
+                        logger.error(
+                            f"🛑 Stopping ingestion after {consecutive_failures} consecutive failures")
+                        stop.set()
+
+                    # Batches finish out of order; only advance the resume
+                    # point over a contiguous run of finished batches
+                    finished_batches.add(batch_id)
+                    while watermark + 1 in finished_batches:
+                        watermark += 1
+                        finished_batches.discard(watermark)
+                    if failed_attempts < self.config.max_retries:
+                        progress["completed_batches"] = watermark
+                        await self._save_progress(progress)
 
                     # Save checkpoint every N batches
                     if batch_id % self.config.checkpoint_interval == 0:
                         checkpoint_data = {
-                            "batch_results": batch_results,
+                            "batch_results": [r for r in results if r is not None],
                             "last_checkpoint": batch_id,
                             "timestamp": datetime.now().isoformat()
                         }
-                        self._save_checkpoint(checkpoint_data)
+                        await self._save_checkpoint(checkpoint_data)
                         logger.info(f"💾 Checkpoint saved at batch {batch_id}")
 
-                    # Progress reporting
-                    progress_percent = (batch_id / total_batches) * 100
-                    logger.info(
-                        f"📊 Batch {batch_id}/{total_batches} completed ({progress_percent:.1f}%)")
+                    # Optional memory cleanup: collect only every N batches
+                    # and only once the process has grown past its budget
+                    gc_interval = self.config.gc_interval_batches
+                    if (self.config.clear_cache_after_batch and gc_interval
+                            and batch_id % gc_interval == 0):
+                        self._maybe_collect(batch_id)
+                finally:
+                    queue.task_done()
 
-                    break  # Success, exit retry loop
-
-                except asyncio.TimeoutError:
-                    consecutive_failures += 1
-                    logger.warning(
-                        f"⏰ Batch {batch_id} timed out (attempt {retry_attempt + 1}/{self.config.max_retries})")
-
-                    if retry_attempt < self.config.max_retries - 1:
-                        wait_time = self.config.retry_delay * \
-                            (2 ** retry_attempt)  # Exponential backoff
-                        logger.info(
-                            f"⏳ Retrying batch {batch_id} in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logger.error(
-                            f"❌ Batch {batch_id} failed after {self.config.max_retries} attempts")
-                        batch_results.append({
-                            "batch_id": batch_id,
-                            "processed": 0,
-                            "errors": [{"batch_error": f"Timeout after {self.config.max_retries} attempts", "error_type": "TimeoutError"}],
-                            "metadata_summary": {}
-                        })
-
-                except Exception as e:
-                    consecutive_failures += 1
-                    logger.error(
-                        f"❌ Batch {batch_id} failed (attempt {retry_attempt + 1}/{self.config.max_retries}): {e}")
-
-                    if retry_attempt < self.config.max_retries - 1:
-                        wait_time = self.config.retry_delay * \
-                            (2 ** retry_attempt)
-                        logger.info(
-                            f"⏳ Retrying batch {batch_id} in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        batch_results.append({
-                            "batch_id": batch_id,
-                            "processed": 0,
-                            "errors": [{"batch_error": str(e), "error_type": type(e).__name__}],
-                            "metadata_summary": {}
-                        })
-
-            # Check for too many consecutive failures
-            if consecutive_failures >= self.config.max_consecutive_failures:
-                logger.error(
-                    f"🛑 Stopping ingestion after {consecutive_failures} consecutive failures")
-                break
-
-            # Optional memory cleanup
-            if self.config.clear_cache_after_batch:
-                await asyncio.sleep(0.1)
+        # Barrier: every queued batch is finished before results are compiled
+        await asyncio.gather(produce(), *[consume() for _ in range(workers)])
+        batch_results = [r for r in results if r is not None]
 
         # Compile comprehensive results
         final_results = self._compile_final_results(
-            products, batch_results, start_time, progress
+            total_fetched, batch_results, start_time, progress
         )
 
         # Log final summary
@@ -277,14 +411,128 @@ class ProductIngestionService:
                     os.remove(self.progress_file)
                 if os.path.exists(self.checkpoint_file):
                     os.remove(self.checkpoint_file)
+                self.lightrag_client.clear_completed()
                 logger.info("🧹 Cleaned up checkpoint files")
             except Exception as e:
                 logger.warning(f"Could not clean up checkpoint files: {e}")
 
         return final_results
 
+    def _plan_batches(self, products: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Split products into batches
+
+        With config.batch_target_tokens set, products are sorted by estimated
+        size and packed greedily up to that token budget, so no batch mixes
+        one huge product with several tiny ones and stalls on it.
+        Otherwise batches are fixed slices of config.batch_size products.
+        """
+        target = self.config.batch_target_tokens
+        if target <= 0:
+            size = self.config.batch_size
+            return [products[i:i + size] for i in range(0, len(products), size)]
+
+        batches = []
+        current = []
+        current_tokens = 0
+        for product in sorted(products, key=_estimate_tokens):
+            tokens = _estimate_tokens(product)
+            if current and current_tokens + tokens > target:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(product)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+
+        logger.info(
+            f"📦 Packed {len(products)} products into {len(batches)} batches of ~{target:,} tokens")
+        return batches
+
+    async def _process_batch_with_retry(self,
+                                        batch: List[Dict[str, Any]],
+                                        batch_id: int,
+                                        total_batches: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Process one batch with timeout and exponential-backoff retries
+
+        Returns:
+            (batch result, number of failed attempts); the batch gave up
+            when the failed attempts reach config.max_retries
+        """
+        logger.info(
+            f"🔄 Processing batch {batch_id}/{total_batches} ({len(batch)} products)")
+
+        # Set timeout for individual batch
+        batch_timeout = self.config.batch_timeout_minutes * 60
+        max_retries = self.config.max_retries
+        failed_attempts = 0
+
+        # Exponential backoff with jitter so batches that failed together
+        # (e.g. on a throttled deployment) don't retry in lockstep
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(max_retries),
+            wait=wait_exponential_jitter(
+                initial=self.config.retry_delay, jitter=self.config.retry_delay),
+            before_sleep=lambda state: logger.info(
+                f"⏳ Retrying batch {batch_id} in {state.next_action.sleep:.1f}s..."),
+            reraise=True,
+        )
+
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    failed_attempts = attempt.retry_state.attempt_number - 1
+                    try:
+                        result = await asyncio.wait_for(
+                            self.batch_processor.process_batch(batch, batch_id),
+                            timeout=batch_timeout
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"⏰ Batch {batch_id} timed out (attempt {failed_attempts + 1}/{max_retries})")
+                        raise
+                    except Exception as e:
+                        logger.error(
+                            f"❌ Batch {batch_id} failed (attempt {failed_attempts + 1}/{max_retries}): {e}")
+                        raise
+
+            # Progress reporting
+            progress_percent = (batch_id / total_batches) * 100
+            logger.info(
+                f"📊 Batch {batch_id}/{total_batches} completed ({progress_percent:.1f}%)")
+            return result, failed_attempts
+
+        except asyncio.TimeoutError:
+            error = {"batch_error": f"Timeout after {max_retries} attempts",
+                     "error_type": "TimeoutError"}
+
+        except Exception as e:
+            error = {"batch_error": str(e), "error_type": type(e).__name__}
+
+        logger.error(
+            f"❌ Batch {batch_id} failed after {self.config.max_retries} attempts")
+        return {
+            "batch_id": batch_id,
+            "processed": 0,
+            "errors": [error],
+            "metadata_summary": {}
+        }, self.config.max_retries
+
+    def _maybe_collect(self, batch_id: int):
+        """Run a full garbage collection if RSS exceeds max_memory_usage_mb"""
+        limit_mb = self.config.max_memory_usage_mb
+        rss_mb = _rss_mb()
+        if limit_mb and rss_mb is not None and rss_mb <= limit_mb:
+            return
+        collected = gc.collect()
+        logger.info(
+            f"🧹 GC after batch {batch_id}: {collected} objects collected"
+            + (f" (RSS {rss_mb} MB > {limit_mb} MB)" if rss_mb is not None else ""))
+
     def _compile_final_results(self,
-                               products: List[Dict[str, Any]],
+                               total_fetched: int,
                                batch_results: List[Dict[str, Any]],
                                start_time: datetime,
                                progress: Dict[str, Any]) -> Dict[str, Any]:
@@ -292,10 +540,21 @@ class ProductIngestionService:
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
 
-        total_processed = sum(r.get("processed", 0) for r in batch_results)
-        total_errors = sum(len(r.get("errors", [])) for r in batch_results)
-        successful_batches = len(
-            [r for r in batch_results if r.get("processed", 0) > 0])
+        # One pass over the batch results for all tallies and a few
+        # example errors
+        total_processed = total_errors = successful_batches = 0
+        sample_errors = []
+        for r in batch_results:
+            processed = r.get("processed", 0)
+            total_processed += processed
+            if processed > 0:
+                successful_batches += 1
+            errors = r.get("errors")
+            if errors:
+                total_errors += len(errors)
+                if len(sample_errors) < MAX_SAMPLE_ERRORS:
+                    sample_errors.extend(
+                        errors[:MAX_SAMPLE_ERRORS - len(sample_errors)])
         failed_batches = len(batch_results) - successful_batches
 
         # Determine status
@@ -306,9 +565,10 @@ class ProductIngestionService:
         else:
             status = "failed"
 
-        return {
+        final_results = {
             "status": status,
-            "total_products": len(products),
+            "total_products": total_fetched,
+            "success_rate": total_processed / total_fetched if total_fetched else 0.0,
             "total_batches": progress.get("total_batches", 0),
             "completed_batches": progress.get("completed_batches", 0),
             "successful_batches": successful_batches,
@@ -319,9 +579,14 @@ class ProductIngestionService:
             "duration_minutes": duration / 60,
             "start_time": start_time.isoformat(),
             "end_time": end_time.isoformat(),
-            "batch_results": batch_results,
+            "sample_errors": sample_errors,
             "can_resume": status in ["partial_success", "failed"] and progress.get("completed_batches", 0) > 0
         }
+        # Per-batch results can run to hundreds of MB on long runs; they
+        # are only kept on disk, and only when asked for
+        if self.config.include_batch_details:
+            final_results["batch_results_file"] = self.batch_details_file
+        return final_results
 
     def _log_final_summary(self, results: Dict[str, Any]):
         """Log comprehensive final summary"""
@@ -335,15 +600,23 @@ class ProductIngestionService:
         logger.info(f"   Successful Batches: {results['successful_batches']}")
         logger.info(f"   Failed Batches: {results['failed_batches']}")
         logger.info(f"   Total Processed: {results['total_processed']:,}")
+        logger.info(f"   Success Rate: {results['success_rate']:.1%}")
         logger.info(f"   Total Errors: {results['total_errors']}")
         logger.info(f"   Duration: {results['duration_minutes']:.1f} minutes")
         logger.info(f"   Can Resume: {results.get('can_resume', False)}")
         logger.info(f"{'='*80}")
 
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up resources"""
         try:
+            self.batch_processor.close()
+            await self.lightrag_client.aclose()
             self.mongodb_client.close()
+            if not self._cleaned_up:
+                self._cleaned_up = True
+                ProductIngestionService._open_services -= 1
+                if not ProductIngestionService._open_services:
+                    await close_async_mongo_client()
             logger.info("🔒 ProductIngestionService resources cleaned up")
         except Exception as e:
             logger.warning(f"Error during cleanup: {e}")
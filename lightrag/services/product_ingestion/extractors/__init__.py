@@ -1,5 +1,5 @@
 """Metadata extraction modules"""
 
-from .metadata_extractor import MetadataExtractor
+from .metadata_extractor import MetadataExtractor, PRODUCT_PROJECTION
 
-__all__ = ['MetadataExtractor']
+__all__ = ['MetadataExtractor', 'PRODUCT_PROJECTION']
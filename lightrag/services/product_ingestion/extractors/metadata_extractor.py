@@ -1,6 +1,7 @@
 """Enhanced metadata extraction from product JSON"""
 
 import logging
+from bisect import bisect_right
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from ..models.metadata import EnhancedProductMetadata, MetadataValidator
@@ -9,16 +10,114 @@ from ..utils.name_resolution import NameResolver
 
 logger = logging.getLogger(__name__)
 
+# Float rating fields copied verbatim from product_json['ratings']
+_RATING_FIELDS = (
+    'overall_rating',
+    'ease_of_use',
+    'breadth_of_features',
+    'ease_of_implementation',
+    'value_for_money',
+    'customer_support',
+)
+
+# Product fields read by MetadataExtractor; fetch with this projection so
+# unused parts of each document never leave MongoDB
+PRODUCT_PROJECTION = {field: 1 for field in (
+    '_id', 'product_name', 'weburl', 'company', 'company_website',
+    'logo_key', 'logo_url', 'pricing', 'ratings', 'created_on', 'updated_on',
+    'features', 'other_features', 'integrations', 'categories',
+    'parent_categories', 'industry', 'industry_size', 'description',
+    'overview', 'usp', 'supports', 'tech_stack', 'languages', 'hq_location',
+    'year_founded', 'contact', 'support_email', 'is_active', 'is_verify',
+    'admin_verified', 'subscription_plan',
+)}
+
+# Product fields holding lookup-collection IDs, with the NameResolver cache
+# that resolves them
+_RESOLVED_FIELDS = (
+    ('features', 'features'),
+    ('supports', 'supports'),
+    ('categories', 'sub_categories'),
+    ('parent_categories', 'parent_categories'),
+    ('industry', 'parent_industries'),
+    ('languages', 'languages'),
+    ('tech_stack', 'techstack'),
+)
+
+# Price range of a product's most expensive plan: the label at
+# bisect_right(bins, amount), so each boundary belongs to the higher range
+_PRICE_BINS = (50, 200, 1000)
+_PRICE_LABELS = ('budget', 'mid-range', 'premium', 'luxury')
+_NUMERIC_TYPES = (int, float)
+
+# Bound once; timestamps are parsed twice per product
+_fromisoformat = datetime.fromisoformat
+
 
 class MetadataExtractor:
     """Extracts comprehensive metadata from product JSON documents"""
 
     def __init__(self, db=None):
         """Initialize the metadata extractor"""
-        self.category_cache = {}  # Cache for category ID to name resolution
-        self.industry_cache = {}  # Cache for industry ID to name resolution
         self.name_resolver = NameResolver(db) if db is not None else None
 
+    @classmethod
+    def from_resolver_snapshot(cls, snapshot: Optional[Dict[str, Dict[str, str]]]) -> "MetadataExtractor":
+        """Extractor for a worker process, resolving names from resolver_snapshot()"""
+        extractor = cls()
+        if snapshot is not None:
+            extractor.name_resolver = NameResolver.from_snapshot(snapshot)
+        return extractor
+
+    @staticmethod
+    def _batch_ids(products: List[Dict[str, Any]]):
+        """Yield (resolver cache, referenced IDs) for each lookup field of a batch"""
+        for field, collection_type in _RESOLVED_FIELDS:
+            ids = []
+            for product in products:
+                values = product.get(field)
+                if values and isinstance(values, list):
+                    ids.extend(value for value in values if value)
+            if ids:
+                yield collection_type, ids
+
+    async def preload_resolvers(self):
+        """
+        Load every lookup collection extract_metadata resolves from, once per run
+
+        Afterwards warm_resolvers() and name resolution are pure cache hits.
+        """
+        if self.name_resolver is None:
+            return
+
+        await self.name_resolver.preload_all(
+            [collection_type for _, collection_type in _RESOLVED_FIELDS])
+        logger.info(
+            f"📚 Preloaded lookup names: {self.name_resolver.get_cache_stats()}")
+
+    def warm_resolvers(self, products: List[Dict[str, Any]]):
+        """
+        Resolve every lookup ID a batch references, one `$in` query per collection
+
+        Call before extracting the batch; extract_metadata then resolves
+        names from the cache instead of querying per product.
+        """
+        if self.name_resolver is None:
+            return
+
+        for collection_type, ids in self._batch_ids(products):
+            self.name_resolver.prefetch(collection_type, ids)
+
+    def resolver_snapshot(self, products: List[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, str]]]:
+        """Names of every lookup ID a batch references, for from_resolver_snapshot()"""
+        if self.name_resolver is None:
+            return None
+
+        return {
+            collection_type: self.name_resolver.snapshot(collection_type, ids)
+            for collection_type, ids in self._batch_ids(products)
+        }
+
     def extract_metadata(self, product_json: Dict[str, Any]) -> EnhancedProductMetadata:
         """
         Extract comprehensive metadata from product JSON
@@ -29,40 +128,50 @@ class MetadataExtractor:
         Returns:
             EnhancedProductMetadata with all extracted fields
         """
+        # Local aliases: this runs once per product on the ingestion hot path
+        get = product_json.get
+        oiu = ObjectIdUtils
+        validator = MetadataValidator
+        safe_str_list = oiu.safe_str_list
+
         try:
             # Core identifiers - use ObjectId utilities
-            product_id = ObjectIdUtils.extract_product_id(product_json)
-            product_name = MetadataValidator.safe_str(
-                product_json.get('product_name'), 'Unknown Product')
-            weburl = MetadataValidator.safe_str(product_json.get('weburl'), '')
-            company = MetadataValidator.safe_str(
-                product_json.get('company'), 'Unknown Company')
+            product_id = oiu.extract_product_id(product_json)
+            product_name = validator.safe_str(
+                get('product_name'), 'Unknown Product')
+            weburl = validator.safe_str(get('weburl'), '')
+            company = validator.safe_str(
+                get('company'), 'Unknown Company')
 
             # Visual and branding - safe string extraction
-            logo_key = product_json.get('logo_key')
-            logo_url = product_json.get('logo_url')
-            company_website = product_json.get('company_website')
+            logo_key = get('logo_key')
+            logo_url = get('logo_url')
+            company_website = get('company_website')
 
             # Extract pricing information using utilities with safe defaults
-            pricing_info = ObjectIdUtils.extract_pricing_summary(
-                product_json.get('pricing', []))
-
-            # Extract ratings with safe defaults
-            ratings = product_json.get('ratings', {})
+            pricing_info = oiu.extract_pricing_summary(
+                get('pricing', []))
+
+            # Extract ratings with safe defaults (table-driven, one pass)
+            ratings = get('ratings') or {}
+            rating_values = {
+                field: validator.safe_float(ratings.get(field), 0.0)
+                for field in _RATING_FIELDS
+            }
 
             # Extract timestamps - use ObjectId utilities with safe defaults
-            created_on = self._parse_timestamp(product_json.get('created_on'))
+            created_on = self._parse_timestamp(get('created_on'))
             updated_on = self._parse_timestamp(
-                ObjectIdUtils.extract_timestamp_field(product_json, 'updated_on'))
+                oiu.extract_timestamp_field(product_json, 'updated_on'))
 
             # Extract features using name resolution
             features = self._extract_features(product_json)
-            other_features = ObjectIdUtils.safe_str_list(
-                product_json.get('other_features', []))
+            other_features = safe_str_list(
+                get('other_features', []))
 
             # Extract integrations using utilities with safe defaults
-            integrations = ObjectIdUtils.normalize_integration_list(
-                product_json.get('integrations', []))
+            integrations = oiu.normalize_integration_list(
+                get('integrations', []))
 
             # Create metadata object
             metadata = EnhancedProductMetadata(
@@ -79,13 +188,13 @@ class MetadataExtractor:
 
                 # Categorization with name resolution
                 categories=self._extract_category_names(
-                    product_json.get('categories', [])),
+                    get('categories', [])),
                 parent_categories=self._extract_parent_category_names(
-                    product_json.get('parent_categories', [])),
+                    get('parent_categories', [])),
                 industry=self._extract_industry_names(
-                    product_json.get('industry', [])),
-                industry_size=ObjectIdUtils.safe_str_list(
-                    product_json.get('industry_size', [])),
+                    get('industry', [])),
+                industry_size=safe_str_list(
+                    get('industry_size', [])),
 
                 # Pricing - with safe defaults
                 pricing_plans=pricing_info.get('plans', []),
@@ -95,56 +204,45 @@ class MetadataExtractor:
                 price_range=pricing_info.get('price_range', 'Unknown'),
 
                 # Content - safe string extraction
-                description=MetadataValidator.safe_str(
-                    product_json.get('description'), ''),
-                overview=MetadataValidator.safe_str(
-                    product_json.get('overview'), ''),
-                usp=MetadataValidator.safe_str(product_json.get('usp'), ''),
+                description=validator.safe_str(
+                    get('description'), ''),
+                overview=validator.safe_str(
+                    get('overview'), ''),
+                usp=validator.safe_str(get('usp'), ''),
 
                 # Features
                 features=features,
                 other_features=other_features,
                 supports=self._extract_supports(
-                    product_json.get('supports', [])),
+                    get('supports', [])),
 
                 # Ratings - use safe extraction with null handling
-                overall_rating=MetadataValidator.safe_float(
-                    ratings.get('overall_rating'), 0.0),
-                ease_of_use=MetadataValidator.safe_float(
-                    ratings.get('ease_of_use'), 0.0),
-                breadth_of_features=MetadataValidator.safe_float(
-                    ratings.get('breadth_of_features'), 0.0),
-                ease_of_implementation=MetadataValidator.safe_float(
-                    ratings.get('ease_of_implementation'), 0.0),
-                value_for_money=MetadataValidator.safe_float(
-                    ratings.get('value_for_money'), 0.0),
-                customer_support=MetadataValidator.safe_float(
-                    ratings.get('customer_support'), 0.0),
-                total_reviews=MetadataValidator.safe_int(
+                **rating_values,
+                total_reviews=validator.safe_int(
                     ratings.get('total_reviews'), 0),
 
                 # Technical
                 integrations=integrations,
                 tech_stack=self._extract_techstack_names(
-                    product_json.get('tech_stack', [])),
+                    get('tech_stack', [])),
                 languages=self._extract_language_names(
-                    product_json.get('languages', [])),
+                    get('languages', [])),
 
                 # Company info using utilities
-                year_founded=ObjectIdUtils.safe_year_founded(product_json),
-                hq_location=product_json.get('hq_location'),
-                contact=ObjectIdUtils.safe_contact_number(product_json),
-                support_email=product_json.get('support_email'),
+                year_founded=oiu.safe_year_founded(product_json),
+                hq_location=get('hq_location'),
+                contact=oiu.safe_contact_number(product_json),
+                support_email=get('support_email'),
 
                 # Status - safe boolean extraction
-                is_active=MetadataValidator.safe_bool(
-                    product_json.get('is_active'), True),
-                is_verified=MetadataValidator.safe_bool(
-                    product_json.get('is_verify'), False),
-                admin_verified=MetadataValidator.safe_bool(
-                    product_json.get('admin_verified'), False),
-                subscription_plan=MetadataValidator.safe_str(
-                    product_json.get('subscription_plan'), 'Basic'),
+                is_active=validator.safe_bool(
+                    get('is_active'), True),
+                is_verified=validator.safe_bool(
+                    get('is_verify'), False),
+                admin_verified=validator.safe_bool(
+                    get('admin_verified'), False),
+                subscription_plan=validator.safe_str(
+                    get('subscription_plan'), 'Basic'),
 
                 # Timestamps
                 created_on=created_on,
@@ -154,10 +252,10 @@ class MetadataExtractor:
             return metadata
 
         except Exception as e:
-            import traceback
             logger.error(
                 f"Error extracting metadata for product {product_json.get('product_name', 'unknown')}: {e}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            # Frames are only formatted when DEBUG logging is enabled
+            logger.debug("Full traceback", exc_info=True)
 
             # Return minimal metadata on error using utilities
             return EnhancedProductMetadata(
@@ -184,28 +282,25 @@ class MetadataExtractor:
         custom_pricing = any(plan.get('plan', '').lower()
                              == 'custom' for plan in pricing_data)
 
-        # Determine price range based on amounts
-        amounts = []
-        for plan in pricing_data:
-            try:
-                amount = float(plan.get('amount', 0))
-                if amount > 0:
-                    amounts.append(amount)
-            except (ValueError, TypeError):
-                pass
-
-        if not amounts or custom_pricing:
-            price_range = 'custom'
-        else:
-            max_amount = max(amounts)
-            if max_amount < 50:
-                price_range = 'budget'
-            elif max_amount < 200:
-                price_range = 'mid-range'
-            elif max_amount < 1000:
-                price_range = 'premium'
-            else:
-                price_range = 'luxury'
+        # Determine price range based on the highest positive amount
+        price_range = 'custom'
+        if not custom_pricing:
+            max_amount = 0.0
+            for plan in pricing_data:
+                amount = plan.get('amount', 0)
+                # Amounts are usually stored as numbers; only other types
+                # (strings, bools, garbage) go through float()
+                if type(amount) not in _NUMERIC_TYPES:
+                    if amount is None:
+                        continue
+                    try:
+                        amount = float(amount)
+                    except (ValueError, TypeError):
+                        continue
+                if amount > max_amount:
+                    max_amount = amount
+            if max_amount > 0:
+                price_range = _PRICE_LABELS[bisect_right(_PRICE_BINS, max_amount)]
 
         currency = pricing_data[0].get(
             'currency', 'USD') if pricing_data else 'USD'
@@ -231,14 +326,7 @@ class MetadataExtractor:
                 return feature_names
 
         # Fallback to IDs as strings - handle ObjectId properly
-        result = []
-        for feature_id in feature_ids:
-            if feature_id:
-                if isinstance(feature_id, dict) and '$oid' in feature_id:
-                    result.append(str(feature_id['$oid']))
-                else:
-                    result.append(str(feature_id))
-        return result
+        return ObjectIdUtils.safe_str_list(feature_ids)
 
     def _extract_supports(self, supports_data: List[Dict[str, Any]]) -> List[str]:
         """Extract support information"""
@@ -253,14 +341,7 @@ class MetadataExtractor:
                 return support_names
 
         # Fallback to IDs as strings - handle ObjectId properly
-        result = []
-        for support in supports_data:
-            if support:
-                if isinstance(support, dict) and '$oid' in support:
-                    result.append(str(support['$oid']))
-                else:
-                    result.append(str(support))
-        return result
+        return ObjectIdUtils.safe_str_list(supports_data)
 
     def _extract_category_names(self, category_data: List[Dict[str, Any]]) -> List[str]:
         """Extract category names from category IDs"""
@@ -275,14 +356,7 @@ class MetadataExtractor:
                 return category_names
 
         # Fallback to IDs as strings
-        category_names = []
-        for cat in category_data:
-            if isinstance(cat, dict) and '$oid' in cat:
-                category_names.append(cat['$oid'])
-            else:
-                category_names.append(str(cat))
-
-        return category_names
+        return ObjectIdUtils.safe_str_list(category_data)
 
     def _extract_industry_names(self, industry_data: List[Dict[str, Any]]) -> List[str]:
         """Extract industry names from industry IDs"""
@@ -297,14 +371,7 @@ class MetadataExtractor:
                 return industry_names
 
         # Fallback to IDs as strings
-        industry_names = []
-        for ind in industry_data:
-            if isinstance(ind, dict) and '$oid' in ind:
-                industry_names.append(ind['$oid'])
-            else:
-                industry_names.append(str(ind))
-
-        return industry_names
+        return ObjectIdUtils.safe_str_list(industry_data)
 
     def _extract_parent_category_names(self, category_data: List[Any]) -> List[str]:
         """Extract parent category names from parent category IDs"""
@@ -356,24 +423,21 @@ class MetadataExtractor:
         if not timestamp_data:
             return None
 
+        # BSON dates already arrive as datetime
+        if isinstance(timestamp_data, datetime):
+            return timestamp_data
+
+        if isinstance(timestamp_data, dict):
+            # MongoDB date object
+            timestamp_data = timestamp_data.get('$date')
+        if not timestamp_data or not isinstance(timestamp_data, str):
+            return None
+
+        # ISO format string; fromisoformat only accepts 'Z' from Python 3.11
+        if timestamp_data[-1] == 'Z':
+            timestamp_data = timestamp_data[:-1] + '+00:00'
         try:
-            if isinstance(timestamp_data, str):
-                # ISO format string
-                return datetime.fromisoformat(timestamp_data.replace('Z', '+00:00'))
-            elif isinstance(timestamp_data, dict) and '$date' in timestamp_data:
-                # MongoDB date object
-                date_str = timestamp_data['$date']
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                return None
-        except (ValueError, TypeError) as e:
+            return _fromisoformat(timestamp_data)
+        except ValueError as e:
             logger.warning(f"Failed to parse timestamp {timestamp_data}: {e}")
             return None
-
-    def set_category_resolver(self, resolver_func):
-        """Set a function to resolve category IDs to names"""
-        self.category_resolver = resolver_func
-
-    def set_industry_resolver(self, resolver_func):
-        """Set a function to resolve industry IDs to names"""
-        self.industry_resolver = resolver_func
@@ -2,5 +2,7 @@
 
 from .config import IngestionConfig
 from .metadata import ProductMetadata, EnhancedProductMetadata
+from .results import ProductError
 
-__all__ = ['IngestionConfig', 'ProductMetadata', 'EnhancedProductMetadata']
+__all__ = ['IngestionConfig', 'ProductMetadata',
+           'EnhancedProductMetadata', 'ProductError']
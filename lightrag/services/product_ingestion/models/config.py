@@ -1,16 +1,21 @@
 """Configuration models for product ingestion"""
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, replace
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IngestionConfig:
     """Configuration for the ingestion process"""
 
     # Batch processing settings
     batch_size: int = 1  # Reduced for faster LLM processing (was 25)
     max_workers: int = 2  # Conservative concurrency
+    product_concurrency: int = 8  # Products extracted/normalized at once per batch
+    process_pool_min_batch: int = 64  # Normalize in a process pool at this batch size (0 = off)
+    batch_target_tokens: int = 0  # Pack size-sorted products into batches of ~this many tokens (0 = fixed batch_size)
+    prefetch_batches: int = 2  # Batches read from MongoDB ahead of the busy workers
 
     # Text processing settings
     chunk_size: int = 800  # Smaller chunks for better granularity
@@ -22,6 +27,7 @@ class IngestionConfig:
     # Performance tuning
     enable_progress_tracking: bool = True
     enable_detailed_logging: bool = True
+    include_batch_details: bool = False  # Stream per-batch results to a JSONL file instead of only summary stats
 
     # Retry settings
     max_retries: int = 3
@@ -30,10 +36,48 @@ class IngestionConfig:
     # Memory optimization
     clear_cache_after_batch: bool = True
     max_memory_usage_mb: Optional[int] = 2048  # 2GB limit
+    gc_interval_batches: int = 50  # Check RSS against max_memory_usage_mb every N batches (0 = off)
 
     # Timeout and resilience settings
     job_timeout_minutes: int = 10080  # 1 week (168 hours)
     batch_timeout_minutes: int = 10  # 10 minutes per batch
     enable_auto_resume: bool = True  # Enable automatic resume on timeout
     max_consecutive_failures: int = 6  # Stop after 6 consecutive batch failures
-    checkpoint_interval: int = 10  # Save progress every 10 batches
+    checkpoint_interval: int = 10  # Save the batch checkpoint every 10 batches
+    completed_ids_flush_interval: int = 10  # Append inserted product ids to the completed-ids file every 10 products
+
+    @classmethod
+    def autotune(cls,
+                 cpu_count: Optional[int] = None,
+                 available_memory_mb: Optional[int] = None,
+                 **overrides) -> "IngestionConfig":
+        """
+        Size batch_size/max_workers from the host instead of the conservative defaults
+
+        Args:
+            cpu_count: Cores to plan for (defaults to os.cpu_count())
+            available_memory_mb: Free memory to plan for (defaults to psutil probe)
+            **overrides: Any IngestionConfig fields; explicit batch_size or
+                max_workers take precedence over the tuned values
+
+        Returns:
+            IngestionConfig with batch_size sized to the memory budget and
+            max_workers capped at 8, unless overridden
+        """
+        base = cls(**overrides)
+
+        cores = cpu_count or os.cpu_count() or 2
+        if available_memory_mb is None:
+            try:
+                import psutil
+                available_memory_mb = psutil.virtual_memory().available // (1 << 20)
+            except ImportError:
+                # Without psutil keep the configured batch size
+                return replace(base, **{"max_workers": min(cores, 8), **overrides})
+
+        # Each batch gets roughly 1/8 of the memory budget
+        budget_mb = base.max_memory_usage_mb or 2048
+        batch_size = max(8, min(64, available_memory_mb // max(1, budget_mb // 8)))
+
+        return replace(base, **{"batch_size": batch_size,
+                                "max_workers": min(cores, 8), **overrides})
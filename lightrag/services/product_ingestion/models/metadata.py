@@ -1,10 +1,20 @@
 """Metadata models for product data"""
 
-from dataclasses import dataclass
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
 
+# Tier lookup tables for EnhancedProductMetadata: a value lands in the label
+# at bisect_right(thresholds, value), so each threshold is inclusive (>=)
+_FEATURE_THRESHOLDS = (5, 10, 20)
+_FEATURE_TIERS = ("basic", "moderate", "rich", "comprehensive")
+_RATING_THRESHOLDS = (0.01, 2.5, 3.5, 4.5)
+_RATING_TIERS = ("unrated", "poor", "average", "good", "excellent")
+
+
 class MetadataValidator:
     """Helper class for safe metadata extraction with null checks"""
     
@@ -83,7 +93,7 @@ class MetadataValidator:
             return False
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProductMetadata:
     """Basic product metadata for filtering and context"""
     product_id: str
@@ -98,7 +108,7 @@ class ProductMetadata:
     specification_count: int
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class EnhancedProductMetadata:
     """Enhanced metadata extracted from your actual product data structure"""
 
@@ -114,13 +124,13 @@ class EnhancedProductMetadata:
     company_website: Optional[str] = None
 
     # Categorization
-    categories: List[str] = None  # Resolved category names
-    parent_categories: List[str] = None
-    industry: List[str] = None
-    industry_size: List[str] = None
+    categories: List[str] = field(default_factory=list)  # Resolved category names
+    parent_categories: List[str] = field(default_factory=list)
+    industry: List[str] = field(default_factory=list)
+    industry_size: List[str] = field(default_factory=list)
 
     # Pricing information
-    pricing_plans: List[Dict[str, Any]] = None
+    pricing_plans: List[Dict[str, Any]] = field(default_factory=list)
     has_free_plan: bool = False
     custom_pricing: bool = False
     pricing_currency: str = "USD"
@@ -131,9 +141,9 @@ class EnhancedProductMetadata:
     usp: str = ""  # Unique selling proposition
 
     # Features and capabilities
-    features: List[str] = None
-    other_features: List[str] = None
-    supports: List[str] = None
+    features: List[str] = field(default_factory=list)
+    other_features: List[str] = field(default_factory=list)
+    supports: List[str] = field(default_factory=list)
 
     # Ratings and reviews - use Optional to handle None values safely
     overall_rating: Optional[float] = 0.0
@@ -146,9 +156,9 @@ class EnhancedProductMetadata:
     rating_tier: str = "unrated"  # excellent, good, average, poor, unrated
 
     # Technical information
-    integrations: List[Dict[str, str]] = None
-    tech_stack: List[str] = None
-    languages: List[str] = None
+    integrations: List[Dict[str, str]] = field(default_factory=list)
+    tech_stack: List[str] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
 
     # Company information
     year_founded: Optional[int] = None
@@ -173,16 +183,16 @@ class EnhancedProductMetadata:
 
     def __post_init__(self):
         """Compute derived fields after initialization with safe null handling"""
-        # Safely initialize list fields
-        if self.features is None:
-            self.features = []
-        if self.other_features is None:
-            self.other_features = []
-        if self.categories is None:
-            self.categories = []
-        if self.integrations is None:
-            self.integrations = []
-        
+        # Intern closed-set string fields read from product data so every
+        # instance shares one object (computed tiers below are literals and
+        # already interned by the compiler)
+        if isinstance(self.pricing_currency, str):
+            self.pricing_currency = sys.intern(self.pricing_currency)
+        if isinstance(self.subscription_plan, str):
+            self.subscription_plan = sys.intern(self.subscription_plan)
+        if isinstance(self.price_range, str):
+            self.price_range = sys.intern(self.price_range)
+
         # Safely normalize rating values to handle None
         self.overall_rating = MetadataValidator.safe_float(self.overall_rating, 0.0)
         self.ease_of_use = MetadataValidator.safe_float(self.ease_of_use, 0.0)
@@ -194,14 +204,8 @@ class EnhancedProductMetadata:
 
         # Compute feature richness
         total_features = len(self.features) + len(self.other_features)
-        if total_features >= 20:
-            self.feature_richness = "comprehensive"
-        elif total_features >= 10:
-            self.feature_richness = "rich"
-        elif total_features >= 5:
-            self.feature_richness = "moderate"
-        else:
-            self.feature_richness = "basic"
+        self.feature_richness = _FEATURE_TIERS[
+            bisect_right(_FEATURE_THRESHOLDS, total_features)]
 
         # Compute market position based on company info and ratings (with safe comparisons)
         if self.year_founded and self.year_founded < 2010:
@@ -214,14 +218,8 @@ class EnhancedProductMetadata:
         else:
             self.market_position = "standard"
 
-        # Compute rating tier - using safe comparisons
-        if MetadataValidator.safe_rating_comparison(self.overall_rating, 4.5):
-            self.rating_tier = "excellent"
-        elif MetadataValidator.safe_rating_comparison(self.overall_rating, 3.5):
-            self.rating_tier = "good"
-        elif MetadataValidator.safe_rating_comparison(self.overall_rating, 2.5):
-            self.rating_tier = "average"
-        elif MetadataValidator.safe_rating_comparison(self.overall_rating, 0.01):
-            self.rating_tier = "poor"
-        else:
-            self.rating_tier = "unrated"
+        # Compute rating tier (overall_rating is a float by now; NaN
+        # compares false against every threshold, so it is unrated)
+        rating = self.overall_rating
+        self.rating_tier = _RATING_TIERS[
+            bisect_right(_RATING_THRESHOLDS, rating) if rating == rating else 0]
@@ -0,0 +1,19 @@
+"""Result records produced during product ingestion"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict
+
+
+@dataclass(slots=True)
+class ProductError:
+    """A single product that failed validation, extraction or normalization"""
+
+    product_index: int
+    product_id: str
+    product_name: str
+    error: str
+    error_type: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict for JSON serialization"""
+        return asdict(self)
@@ -2,12 +2,22 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
+# Keep only the last N history messages to prevent memory issues
+MAX_HISTORY_MESSAGES = 1000
+
+# Smoothing factor for the per-batch duration EMA behind the ETA
+ETA_EMA_ALPHA = 0.3
+
+# Pending status updates allowed before callers are back-pressured
+STATUS_QUEUE_MAXSIZE = 64
+
 
 class PipelineStatusIntegrator:
     """
@@ -17,19 +27,30 @@ class PipelineStatusIntegrator:
     without needing terminal monitoring.
     """
 
+    __slots__ = ("pipeline_status", "pipeline_status_lock", "_initialized",
+                 "_update_queue", "_flusher_task", "_loop")
+
     def __init__(self):
         self.pipeline_status = None
         self.pipeline_status_lock = None
         self._initialized = False
+        self._update_queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Event loop the queue and flusher task belong to
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def initialize(self):
         """Initialize connection to LightRAG's pipeline status system"""
+        self._initialized = False
         try:
             # Import LightRAG's pipeline status system
             from lightrag.kg.shared_storage import get_namespace_data, get_pipeline_status_lock
 
             self.pipeline_status = await get_namespace_data("pipeline_status")
             self.pipeline_status_lock = get_pipeline_status_lock()
+
+            # Status updates are coalesced by a single background writer
+            self._start_flusher()
             self._initialized = True
 
             logger.info("✅ Pipeline status integrator initialized")
@@ -67,6 +88,7 @@ class PipelineStatusIntegrator:
 
         # Initialize job status
         await self._set_job_status(
+            timestamp=start_time,
             busy=True,
             job_name=job_name,
             job_start=start_time,
@@ -95,45 +117,108 @@ class PipelineStatusIntegrator:
             )
             raise
 
-    async def _set_job_status(self, **status_updates):
-        """Update pipeline status with new information"""
+        finally:
+            # Make sure the final status is visible before the caller moves on
+            await self.flush()
+
+    async def _set_job_status(self, *, timestamp: Optional[datetime] = None, **status_updates):
+        """
+        Queue a pipeline status update; the flusher task applies it
+
+        Returns immediately unless STATUS_QUEUE_MAXSIZE updates are already
+        pending, so batch processing never waits on pipeline_status_lock.
+        """
         if not self._initialized:
-            # Log status updates when not integrated
-            logger.info(f"📊 Job Status Update: {status_updates}")
+            # JobMonitor already logs each message at INFO; the raw update
+            # dict is only useful when debugging standalone runs
+            logger.debug("📊 Job Status Update: %s", status_updates)
             return
 
-        try:
-            async with self.pipeline_status_lock:
-                # Update status
-                for key, value in status_updates.items():
-                    if key == "job_start" and isinstance(value, datetime):
-                        # Convert datetime to ISO string
-                        self.pipeline_status[key] = value.isoformat()
-                    else:
-                        self.pipeline_status[key] = value
-
-                # Add to history if we have a message
-                if "latest_message" in status_updates:
-                    message = status_updates["latest_message"]
-                    if "history_messages" not in self.pipeline_status:
-                        self.pipeline_status["history_messages"] = []
-
-                    # Add timestamp to message
-                    timestamped_message = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
-                    self.pipeline_status["history_messages"].append(
-                        timestamped_message)
-
-                    # Keep only last 1000 messages to prevent memory issues
-                    if len(self.pipeline_status["history_messages"]) > 1000:
-                        self.pipeline_status["history_messages"] = self.pipeline_status["history_messages"][-1000:]
-
-        except Exception as e:
-            logger.error(f"❌ Failed to update pipeline status: {e}")
+        if not self._flusher_running():
+            # The queue and flusher belong to the loop that created them; a
+            # later asyncio.run (or a flusher that died) needs fresh ones
+            self._start_flusher()
+
+        # Timestamp at enqueue time so history reflects when the event happened
+        await self._update_queue.put((timestamp or datetime.now(), status_updates))
+
+    async def flush(self):
+        """Wait until every queued status update has been written"""
+        # A queue left over from another loop (or without a flusher) has
+        # nothing this loop can wait on
+        if self._update_queue is not None and self._flusher_running():
+            await self._update_queue.join()
+
+    def _start_flusher(self):
+        """Create the update queue and its flusher task on the running loop"""
+        self._loop = asyncio.get_running_loop()
+        self._update_queue = asyncio.Queue(maxsize=STATUS_QUEUE_MAXSIZE)
+        self._flusher_task = self._loop.create_task(self._flush_loop(self._update_queue))
+
+    def _flusher_running(self) -> bool:
+        """Whether the flusher task is alive on the running loop"""
+        return (self._loop is asyncio.get_running_loop()
+                and self._flusher_task is not None
+                and not self._flusher_task.done())
+
+    async def _flush_loop(self, queue: asyncio.Queue):
+        """Drain queued updates and apply each burst under one lock acquisition"""
+        while True:
+            items = [await queue.get()]
+            while not queue.empty():
+                items.append(queue.get_nowait())
+
+            # Merge: last writer wins for scalar keys, messages accumulate
+            merged: Dict[str, Any] = {}
+            messages = []
+            for timestamp, updates in items:
+                merged.update(updates)
+                if "latest_message" in updates:
+                    messages.append(
+                        f"[{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}] "
+                        f"{updates['latest_message']}")
+
+            try:
+                async with self.pipeline_status_lock:
+                    self._apply_status(merged, messages)
+            except Exception as e:
+                logger.error(f"❌ Failed to update pipeline status: {e}")
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    def _apply_status(self, status_updates: Dict[str, Any], messages: list):
+        """Write merged updates into the shared pipeline status (lock held)"""
+        for key, value in status_updates.items():
+            if key == "job_start" and isinstance(value, datetime):
+                # Convert datetime to ISO string
+                self.pipeline_status[key] = value.isoformat()
+            else:
+                self.pipeline_status[key] = value
+
+        # Add to history if we have messages
+        if messages:
+            if "history_messages" not in self.pipeline_status:
+                self.pipeline_status["history_messages"] = []
+            history = self.pipeline_status["history_messages"]
+
+            # Only the newest MAX_HISTORY_MESSAGES of this burst can survive
+            history.extend(messages[-MAX_HISTORY_MESSAGES:])
+
+            # Trim in place: the shared list (possibly a Manager proxy) is also
+            # sliced and cleared by the document routes, so it must stay a list
+            # and keep its identity rather than be swapped for a copy or deque
+            overflow = len(history) - MAX_HISTORY_MESSAGES
+            if overflow > 0:
+                del history[:overflow]
 
 
 class JobMonitor:
     """Monitor for individual batch processing jobs"""
 
+    __slots__ = ("integrator", "job_name", "total_batches", "start_time",
+                 "current_batch", "avg_batch_s", "_last_t", "_last_batch")
+
     def __init__(self, integrator: PipelineStatusIntegrator, job_name: str, total_batches: int, start_time: datetime):
         self.integrator = integrator
         self.job_name = job_name
@@ -141,6 +226,11 @@ class JobMonitor:
         self.start_time = start_time
         self.current_batch = 0
 
+        # Smoothed seconds per batch, measured on the monotonic clock
+        self.avg_batch_s: Optional[float] = None
+        self._last_t = time.monotonic()
+        self._last_batch = 0
+
     async def update_progress(self, batch_id: int, message: str = None, **extra_data):
         """
         Update job progress
@@ -157,13 +247,22 @@ class JobMonitor:
         if not message:
             message = f"Processing batch {batch_id}/{self.total_batches} ({progress_percent:.1f}%)"
 
-        # Calculate estimated time remaining
-        elapsed_time = datetime.now() - self.start_time
-        if batch_id > 0:
-            avg_time_per_batch = elapsed_time.total_seconds() / batch_id
-            remaining_batches = self.total_batches - batch_id
-            eta_seconds = remaining_batches * avg_time_per_batch
-            eta_message = f" - ETA: {int(eta_seconds//60)}m {int(eta_seconds % 60)}s"
+        # Update the EMA of batch duration (alpha=0.3 favours recent batches)
+        now = datetime.now()
+        t = time.monotonic()
+        batches_done = batch_id - self._last_batch
+        if batches_done > 0:
+            last = (t - self._last_t) / batches_done
+            self.avg_batch_s = last if self.avg_batch_s is None else (
+                ETA_EMA_ALPHA * last + (1 - ETA_EMA_ALPHA) * self.avg_batch_s)
+            self._last_t = t
+            self._last_batch = batch_id
+
+        # Early batches give an unreliable estimate, so hold the ETA back
+        if self.avg_batch_s is not None and batch_id >= max(3, self.total_batches // 10):
+            eta_seconds = int((self.total_batches - batch_id) * self.avg_batch_s)
+            eta_min, eta_sec = divmod(eta_seconds, 60)
+            eta_message = f" - ETA: {eta_min}m {eta_sec}s"
         else:
             eta_message = ""
 
@@ -176,33 +275,30 @@ class JobMonitor:
             **extra_data
         }
 
-        await self.integrator._set_job_status(**status_update)
+        await self.integrator._set_job_status(timestamp=now, **status_update)
 
         # Also log for terminal users
-        logger.info(f"📊 {full_message}")
+        logger.info("📊 %s", full_message)
 
     async def add_message(self, message: str):
         """Add a message to the status history without updating progress"""
         await self.integrator._set_job_status(latest_message=message)
-        logger.info(f"📝 {message}")
+        logger.info("📝 %s", message)
 
     async def report_batch_results(self, batch_results: Dict[str, Any]):
         """Report detailed batch processing results"""
-        batch_id = batch_results.get("batch_id", "unknown")
-        processed = batch_results.get("processed", 0)
-        errors = len(batch_results.get("errors", []))
-        duration = batch_results.get("duration_seconds", 0)
-
-        message = f"Batch {batch_id}: {processed} processed, {errors} errors, {duration:.1f}s"
-
-        # Include metadata summary if available
-        metadata_summary = batch_results.get("metadata_summary", {})
-        if metadata_summary:
-            total_products = metadata_summary.get("total_products", 0)
-            avg_rating = metadata_summary.get(
-                "statistics", {}).get("average_rating", 0)
-            if avg_rating > 0:
-                message += f", avg rating: {avg_rating}"
+        get = batch_results.get
+        batch_id = get("batch_id", "unknown")
+        errors = len(get("errors") or ())
+        duration = get("duration_seconds", 0)
+
+        # Include average rating from the metadata summary if available
+        stats = (get("metadata_summary") or {}).get("statistics") or {}
+        avg_rating = stats.get("average_rating", 0)
+        rating_note = f", avg rating: {avg_rating}" if avg_rating > 0 else ""
+
+        message = (f"Batch {batch_id}: {get('processed', 0)} processed, "
+                   f"{errors} errors, {duration:.1f}s{rating_note}")
 
         await self.add_message(message)
 
@@ -210,9 +306,31 @@ class JobMonitor:
 # Global instance for easy access
 pipeline_integrator = PipelineStatusIntegrator()
 
+# Guards initialization of the global instance; created per event loop
+# because asyncio primitives cannot be shared across asyncio.run calls
+_init_lock: Optional[asyncio.Lock] = None
+_init_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_init_lock() -> asyncio.Lock:
+    """Return the initialization lock for the running loop"""
+    global _init_lock, _init_lock_loop
+    loop = asyncio.get_running_loop()
+    if _init_lock is None or _init_lock_loop is not loop:
+        _init_lock = asyncio.Lock()
+        _init_lock_loop = loop
+    return _init_lock
+
+
+def _needs_init(loop: asyncio.AbstractEventLoop) -> bool:
+    return not pipeline_integrator._initialized or pipeline_integrator._loop is not loop
+
 
 async def get_pipeline_integrator() -> PipelineStatusIntegrator:
-    """Get the global pipeline integrator instance"""
-    if not pipeline_integrator._initialized:
-        await pipeline_integrator.initialize()
+    """Get the global pipeline integrator instance, initialized on the running loop"""
+    loop = asyncio.get_running_loop()
+    if _needs_init(loop):
+        async with _get_init_lock():
+            if _needs_init(loop):
+                await pipeline_integrator.initialize()
     return pipeline_integrator
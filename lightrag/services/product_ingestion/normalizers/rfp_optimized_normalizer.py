@@ -29,19 +29,23 @@ class RFPOptimizedNormalizer:
         - Keep technical details minimal but present
         """
 
+        # Fragments are collected and joined once at the end
+        parts = []
+        append = parts.append
+
         # Start with clear business identity and use case
-        text = f"""Product: {metadata.product_name}
+        append(f"""Product: {metadata.product_name}
 Product ID: {metadata.product_id}
 Product URL: {metadata.weburl}
 Company: {metadata.company}
 Company Website: {metadata.company_website or 'Not specified'}
-Category: {', '.join(metadata.categories) if metadata.categories else 'Software Solution'}"""
+Category: {', '.join(metadata.categories) if metadata.categories else 'Software Solution'}""")
 
         # Add parent categories for broader context
         if metadata.parent_categories:
-            text += f"\nParent Categories: {', '.join(metadata.parent_categories)}"
+            append(f"\nParent Categories: {', '.join(metadata.parent_categories)}")
 
-        text += f"\n\nBusiness Purpose: {metadata.description}\n\n"
+        append(f"\n\nBusiness Purpose: {metadata.description}\n\n")
 
         # Skip verbose USP and overview sections for faster LLM processing
         # The Business Purpose above already provides the key context
@@ -60,7 +64,7 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
                 # Top 6 additional (was 12)
                 capabilities.extend(metadata.other_features[:6])
 
-            text += f"Capabilities: {', '.join(capabilities)}\n\n"
+            append(f"Capabilities: {', '.join(capabilities)}\n\n")
 
         # Target market and use cases (critical for RFP matching)
         market_context = []
@@ -76,14 +80,14 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
             market_context.append(f"Headquarters: {metadata.hq_location}")
 
         if market_context:
-            text += f"{' | '.join(market_context)}\n\n"
+            append(f"{' | '.join(market_context)}\n\n")
 
         # Integration ecosystem (essential for RFP technical requirements)
         if metadata.integrations:
             integration_names = [integration['name']
                                  # Reduced from 8 to 5
                                  for integration in metadata.integrations[:5]]
-            text += f"Integrations: {', '.join(integration_names)}\n\n"
+            append(f"Integrations: {', '.join(integration_names)}\n\n")
 
         # Business model and pricing (critical for RFP budget considerations)
         pricing_info = [f"Pricing: {metadata.price_range}"]
@@ -92,8 +96,8 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
         if metadata.custom_pricing:
             pricing_info.append("Custom Pricing Available")
 
-        text += f"{' | '.join(pricing_info)}\n"
-        text += f"Customer Rating: {metadata.overall_rating:.2f}/5.0 ({metadata.total_reviews} reviews)\n"
+        append(f"{' | '.join(pricing_info)}\n")
+        append(f"Customer Rating: {metadata.overall_rating:.2f}/5.0 ({metadata.total_reviews} reviews)\n")
 
         # Add detailed user experience ratings (important for RFP evaluation)
         ux_ratings = []
@@ -108,9 +112,9 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
             ux_ratings.append(f"Value: {metadata.value_for_money:.2f}/5.0")
 
         if ux_ratings:
-            text += f"User Experience: {' | '.join(ux_ratings)}\n"
+            append(f"User Experience: {' | '.join(ux_ratings)}\n")
 
-        text += "\n"
+        append("\n")
 
         # Company credibility (important for RFP vendor evaluation)
         company_context = [
@@ -119,7 +123,7 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
             years_in_business = 2024 - metadata.year_founded
             company_context.append(f"Established: {years_in_business} years")
 
-        text += f"{' | '.join(company_context)}\n"
+        append(f"{' | '.join(company_context)}\n")
 
         # Technical platform support (for RFP technical requirements)
         technical_specs = []
@@ -133,11 +137,11 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
                 f"Tech Stack: {', '.join(metadata.tech_stack[:6])}")
 
         if technical_specs:
-            text += f"{' | '.join(technical_specs)}\n"
+            append(f"{' | '.join(technical_specs)}\n")
 
         # Language support for localization requirements
         if metadata.languages:
-            text += f"Supported Languages: {', '.join(metadata.languages[:8])}\n"
+            append(f"Supported Languages: {', '.join(metadata.languages[:8])}\n")
 
         # Visual assets for branding context
         brand_assets = []
@@ -147,6 +151,6 @@ Category: {', '.join(metadata.categories) if metadata.categories else 'Software
             brand_assets.append(f"Logo URL: {metadata.logo_url}")
 
         if brand_assets:
-            text += f"Brand Assets: {' | '.join(brand_assets)}\n"
+            append(f"Brand Assets: {' | '.join(brand_assets)}\n")
 
-        return text.strip()
+        return "".join(parts).strip()
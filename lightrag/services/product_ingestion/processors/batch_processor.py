@@ -2,11 +2,16 @@
 
 import logging
 import asyncio
-from typing import Dict, List, Any
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter
 
 from ..models.metadata import EnhancedProductMetadata
+from ..models.results import ProductError
 from ..extractors.metadata_extractor import MetadataExtractor
 from ..normalizers.rfp_optimized_normalizer import RFPOptimizedNormalizer
 from ..clients.lightrag_client import LightRAGClient
@@ -14,13 +19,51 @@ from ..utils.objectid_utils import ObjectIdUtils
 
 logger = logging.getLogger(__name__)
 
+# Worker processes start from a clean server process, not a fork of this
+# one: the event loop's threads (to_thread workers, pymongo monitors, httpx)
+# may hold locks at fork time that a forked child could never release
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+def _normalize_one(product: Dict[str, Any], metadata: EnhancedProductMetadata) -> str:
+    """Normalize a product in a worker process (module-level so it pickles)"""
+    return RFPOptimizedNormalizer().normalize_product(product, metadata)
+
+
+def _extract_many(products: List[Dict[str, Any]],
+                  snapshot: Optional[Dict[str, Dict[str, str]]]) -> List[Any]:
+    """
+    Extract metadata for a slice of a batch in a worker process
+
+    Returns one EnhancedProductMetadata per product, or the exception that
+    product raised, so one bad product doesn't fail its whole slice.
+    """
+    extractor = MetadataExtractor.from_resolver_snapshot(snapshot)
+    results = []
+    for product in products:
+        try:
+            results.append(extractor.extract_metadata(product))
+        except Exception as e:
+            results.append(e)
+    return results
+
 
 class BatchProcessor:
     """Handles batch processing of products with progress tracking"""
 
-    def __init__(self, lightrag_client: LightRAGClient, db=None):
+    def __init__(self,
+                 lightrag_client: LightRAGClient,
+                 db=None,
+                 concurrency: int = 8,
+                 process_pool_min_batch: int = 64):
         """Initialize batch processor"""
         self.lightrag_client = lightrag_client
+        self.concurrency = max(1, concurrency)
+
+        # Batches at least this large normalize in a process pool (0 disables)
+        self.process_pool_min_batch = process_pool_min_batch
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
         self.metadata_extractor = MetadataExtractor(db)
         self.product_normalizer = RFPOptimizedNormalizer()
 
@@ -38,6 +81,7 @@ class BatchProcessor:
             Batch processing results with metadata summary
         """
         start_time = datetime.now()
+        start_perf = time.perf_counter()
         logger.info(
             f"🔄 Processing batch {batch_id} ({len(products)} products)")
 
@@ -64,105 +108,53 @@ class BatchProcessor:
             })
             return batch_results
 
+        # Validate once up front; only well-formed products reach the workers
+        valid, invalid = [], []
         for i, product in enumerate(products):
-            try:
-                # Get product name for logging
-                product_name = product.get('product_name', 'Unknown') if isinstance(
-                    product, dict) else 'Invalid Product'
-
-                # Validate product is a dictionary
-                if not isinstance(product, dict):
-                    logger.warning(
-                        f"⚠️  Skipping invalid product {i+1} - not a dictionary")
-                    error_info = {
-                        "product_index": i,
-                        "product_id": "unknown",
-                        "product_name": "unknown",
-                        "error": "Product is not a dictionary",
-                        "error_type": "TypeError"
-                    }
-                    batch_results["errors"].append(error_info)
-                    continue
-
-                # Validate product has required fields
-                if not product.get('product_name'):
-                    logger.warning(
-                        f"⚠️  Skipping product {i+1} - missing product_name field")
-                    error_info = {
-                        "product_index": i,
-                        "product_id": ObjectIdUtils.extract_product_id(product),
-                        "product_name": "missing",
-                        "error": "Product missing product_name field",
-                        "error_type": "ValidationError"
-                    }
-                    batch_results["errors"].append(error_info)
-                    continue
-
-                # Extract enhanced metadata
-                try:
-                    metadata = self.metadata_extractor.extract_metadata(
-                        product)
-                    logger.debug(
-                        f"📊 Extracted metadata for: {metadata.product_name}")
-                except Exception as e:
-                    logger.error(
-                        f"❌ Failed to extract metadata for {product_name}: {e}")
-                    error_info = {
-                        "product_index": i,
-                        "product_id": ObjectIdUtils.extract_product_id(product),
-                        "product_name": product_name,
-                        "error": f"Metadata extraction failed: {e}",
-                        "error_type": "MetadataExtractionError"
-                    }
-                    batch_results["errors"].append(error_info)
-                    continue
-
-                # Normalize to rich text
-                try:
-                    normalized_text = self.product_normalizer.normalize_product(
-                        product, metadata)
-                    logger.debug(
-                        f"📝 Normalized text for {metadata.product_name} ({len(normalized_text)} chars)")
-                except Exception as e:
-                    logger.error(f"❌ Failed to normalize {product_name}: {e}")
-                    error_info = {
-                        "product_index": i,
-                        "product_id": metadata.product_id if 'metadata' in locals() else "unknown",
-                        "product_name": metadata.product_name if 'metadata' in locals() else product_name,
-                        "error": f"Text normalization failed: {e}",
-                        "error_type": "NormalizationError"
-                    }
-                    batch_results["errors"].append(error_info)
-                    continue
-
-                # Store results
-                batch_results["normalized_texts"].append(normalized_text)
-                batch_results["product_metadata"].append(metadata)
-                batch_results["processed"] += 1
-
-                logger.info(
-                    f"✅ Processed {metadata.product_name} ({i+1}/{len(products)})")
+            (valid if isinstance(product, dict) and product.get('product_name')
+             else invalid).append((i, product))
+        batch_results["errors"].extend(
+            [self._validation_error(i, product) for i, product in invalid])
+
+        # Resolve the batch's lookup IDs up front (one query per collection)
+        # so per-product extraction only hits the resolver cache
+        if valid:
+            await asyncio.to_thread(
+                self.metadata_extractor.warm_resolvers,
+                [product for _, product in valid])
+
+        # Large batches extract and normalize across cores; small ones
+        # aren't worth pickling
+        cpu_pool = None
+        extracted = [None] * len(valid)
+        if self.process_pool_min_batch and len(valid) >= self.process_pool_min_batch:
+            cpu_pool = self._get_cpu_pool()
+            extracted = await self._extract_in_pool(
+                cpu_pool, [product for _, product in valid])
+
+        # Process products concurrently, bounded by the semaphore
+        sem = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *[self._process_one(product, i, len(products), sem, cpu_pool, metadata)
+              for (i, product), metadata in zip(valid, extracted)]
+        )
 
-            except Exception as e:
-                # Safe error handling
-                try:
-                    product_id = ObjectIdUtils.extract_product_id(
-                        product) if isinstance(product, dict) else "unknown"
-                    product_name = product.get('product_name', 'unknown') if isinstance(
-                        product, dict) else "unknown"
-                except:
-                    product_id = "unknown"
-                    product_name = "unknown"
-
-                error_info = {
-                    "product_index": i,
-                    "product_id": product_id,
-                    "product_name": product_name,
-                    "error": str(e),
-                    "error_type": type(e).__name__
-                }
-                batch_results["errors"].append(error_info)
-                logger.warning(f"⚠️  Error processing product {i+1}: {e}")
+        # Partition in input order so texts and metadata stay aligned
+        texts_append = batch_results["normalized_texts"].append
+        meta_append = batch_results["product_metadata"].append
+        errors_append = batch_results["errors"].append
+        for ok, payload in results:
+            if ok:
+                texts_append(payload[0])
+                meta_append(payload[1])
+            else:
+                errors_append(payload)
+        batch_results["processed"] = len(batch_results["normalized_texts"])
+
+        # Generate metadata summary before the texts and metadata are released
+        batch_results["metadata_summary"] = self._generate_metadata_summary(
+            batch_results["product_metadata"]
+        )
 
         # Insert batch into LightRAG if we have processed texts
         if batch_results["normalized_texts"]:
@@ -174,6 +166,10 @@ class BatchProcessor:
                 )
                 logger.info(
                     f"✅ Batch {batch_id} successfully inserted into LightRAG knowledge graph")
+
+                # LightRAG owns the content now; keep only the summary
+                batch_results["normalized_texts"].clear()
+                batch_results["product_metadata"].clear()
             except Exception as e:
                 logger.error(
                     f"❌ Failed to insert batch {batch_id} into LightRAG: {e}")
@@ -182,16 +178,9 @@ class BatchProcessor:
                     "error_type": "lightrag_insertion"
                 })
 
-        # Generate metadata summary
-        batch_results["metadata_summary"] = self._generate_metadata_summary(
-            batch_results["product_metadata"]
-        )
-
         # Calculate processing time
-        end_time = datetime.now()
-        batch_results["end_time"] = end_time.isoformat()
-        batch_results["duration_seconds"] = (
-            end_time - start_time).total_seconds()
+        batch_results["end_time"] = datetime.now().isoformat()
+        batch_results["duration_seconds"] = time.perf_counter() - start_perf
 
         logger.info(
             f"📊 Batch {batch_id} completed in {batch_results['duration_seconds']:.2f}s")
@@ -200,84 +189,177 @@ class BatchProcessor:
 
         return batch_results
 
-    async def _insert_batch_to_lightrag(self, normalized_texts: List[str], batch_id: int, product_metadata: List = None):
-        """Insert batch of normalized texts into LightRAG with progressive processing"""
+    async def _process_one(self,
+                           product: Dict[str, Any],
+                           i: int,
+                           total: int,
+                           sem: asyncio.Semaphore,
+                           cpu_pool: Optional[Executor] = None,
+                           metadata: Any = None) -> Tuple[bool, Any]:
+        """
+        Extract and normalize a single pre-validated product
 
-        # For very small batches (≤3 products), process individually for better performance
-        if len(normalized_texts) <= 3:
-            logger.info(
-                f"🔄 Processing batch {batch_id} individually ({len(normalized_texts)} products)")
-
-            for i, text in enumerate(normalized_texts):
-                product_header = f"PRODUCT {i+1} FROM BATCH {batch_id}\n\n"
-                final_text = product_header + text
-                source_name = f"product_batch_{batch_id}_item_{i+1}"
-
-                # Extract product info for enhanced metadata if available
-                product_id = None
-                category = None
-                extracted_metadata = None
-                if product_metadata and i < len(product_metadata):
-                    metadata = product_metadata[i]
-                    product_id = metadata.product_id
-                    category = metadata.categories[0] if metadata.categories else None
-
-                    # Extract essential metadata for vector storage (only from normalizer)
-                    extracted_metadata = {
-                        "weburl": metadata.weburl,
-                        "company": metadata.company,
-                        "company_website": metadata.company_website,
-                        "category_ids": metadata.categories,  # List of category IDs
-                        "logo_key": metadata.logo_key,
-                        "logo_url": metadata.logo_url
-                    }
-
-                success = await self.lightrag_client.insert_text_with_source(
-                    final_text, source_name, product_id, category, extracted_metadata)
-                if not success:
-                    raise Exception(
-                        f"Failed to insert product {i+1} from batch {batch_id} into LightRAG")
+        `metadata` is the product's result from _extract_in_pool, if the
+        batch was extracted there (metadata or the exception raised).
 
-                logger.info(
-                    f"✅ Product {i+1}/{len(normalized_texts)} from batch {batch_id} processed (ID: {product_id})")
-        else:
-            # For larger batches, use original combined approach
-            batch_separator = f"\n\n{'='*80}\nBATCH {batch_id} PRODUCT SEPARATOR\n{'='*80}\n\n"
-            combined_text = batch_separator.join(normalized_texts)
+        Returns:
+            (True, (normalized_text, metadata)) on success,
+            (False, ProductError) on failure
+        """
+        product_name = product['product_name']
+
+        async with sem:
+            # Extract enhanced metadata (may hit Mongo via the name resolver)
+            try:
+                if isinstance(metadata, Exception):
+                    raise metadata
+                if metadata is None:
+                    metadata = await asyncio.to_thread(
+                        self.metadata_extractor.extract_metadata, product)
+                logger.debug("📊 Extracted metadata for: %s",
+                             metadata.product_name)
+            except Exception as e:
+                logger.error(
+                    "❌ Failed to extract metadata for %s: %s", product_name, e)
+                return False, ProductError(
+                    product_index=i,
+                    product_id=ObjectIdUtils.extract_product_id(product),
+                    product_name=product_name,
+                    error=f"Metadata extraction failed: {e}",
+                    error_type="MetadataExtractionError"
+                )
+
+            # Normalize to rich text
+            try:
+                if cpu_pool is not None:
+                    normalized_text = await asyncio.get_running_loop().run_in_executor(
+                        cpu_pool, _normalize_one, product, metadata)
+                else:
+                    normalized_text = await asyncio.to_thread(
+                        self.product_normalizer.normalize_product, product, metadata)
+                logger.debug("📝 Normalized text for %s (%d chars)",
+                             metadata.product_name, len(normalized_text))
+            except Exception as e:
+                logger.error("❌ Failed to normalize %s: %s", product_name, e)
+                return False, ProductError(
+                    product_index=i,
+                    product_id=metadata.product_id,
+                    product_name=metadata.product_name,
+                    error=f"Text normalization failed: {e}",
+                    error_type="NormalizationError"
+                )
+
+        logger.info("✅ Processed %s (%d/%d)",
+                    metadata.product_name, i + 1, total)
+        return True, (normalized_text, metadata)
+
+    async def _extract_in_pool(self,
+                               cpu_pool: Executor,
+                               products: List[Dict[str, Any]]) -> List[Any]:
+        """Extract a batch's metadata across the process pool, one slice per worker"""
+        # Workers can't reach MongoDB; hand them the batch's resolved names
+        snapshot = await asyncio.to_thread(
+            self.metadata_extractor.resolver_snapshot, products)
+
+        loop = asyncio.get_running_loop()
+        size = -(-len(products) // (os.cpu_count() or 1))
+        slices = await asyncio.gather(*[
+            loop.run_in_executor(
+                cpu_pool, _extract_many, products[start:start + size], snapshot)
+            for start in range(0, len(products), size)
+        ])
+        return [metadata for chunk in slices for metadata in chunk]
+
+    def _get_cpu_pool(self) -> ProcessPoolExecutor:
+        """Create the extraction/normalization process pool on first use"""
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=_MP_CONTEXT)
+            logger.info(
+                f"🧮 Started normalization process pool ({os.cpu_count()} workers)")
+        return self._cpu_pool
+
+    def close(self):
+        """Shut down the normalization process pool if it was started"""
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=True, cancel_futures=True)
+            self._cpu_pool = None
+
+    @staticmethod
+    def _validation_error(i: int, product: Any) -> ProductError:
+        """Build the error record for a product rejected by up-front validation"""
+        if not isinstance(product, dict):
+            logger.warning(
+                "⚠️  Skipping invalid product %d - not a dictionary", i + 1)
+            return ProductError(
+                product_index=i,
+                product_id="unknown",
+                product_name="unknown",
+                error="Product is not a dictionary",
+                error_type="TypeError"
+            )
+
+        logger.warning(
+            "⚠️  Skipping product %d - missing product_name field", i + 1)
+        return ProductError(
+            product_index=i,
+            product_id=ObjectIdUtils.extract_product_id(product),
+            product_name="missing",
+            error="Product missing product_name field",
+            error_type="ValidationError"
+        )
 
-            # Add batch header
-            batch_header = f"PRODUCT BATCH {batch_id} - {len(normalized_texts)} PRODUCTS\n\n"
-            final_text = batch_header + combined_text
+    async def _insert_batch_to_lightrag(self, normalized_texts: List[str], batch_id: int, product_metadata: List = None):
+        """Insert each normalized product into LightRAG as its own document"""
+        logger.info(
+            f"🔄 Inserting batch {batch_id} ({len(normalized_texts)} products)")
 
-            # Insert into LightRAG with proper source identification
-            source_name = f"product_batch_{batch_id}"
+        documents = []
+        for i, text in enumerate(normalized_texts):
+            product_header = f"PRODUCT {i+1} FROM BATCH {batch_id}\n\n"
+            final_text = product_header + text
+            source_name = f"product_batch_{batch_id}_item_{i+1}"
 
-            # For combined batches, use first product's metadata for category
+            # Extract product info for enhanced metadata if available
+            product_id = None
             category = None
-            if product_metadata and len(product_metadata) > 0:
-                first_metadata = product_metadata[0]
-                category = first_metadata.categories[0] if first_metadata.categories else None
+            extracted_metadata = None
+            if product_metadata and i < len(product_metadata):
+                metadata = product_metadata[i]
+                product_id = metadata.product_id
+                category = metadata.categories[0] if metadata.categories else None
+
+                # Extract essential metadata for vector storage (only from normalizer)
+                extracted_metadata = {
+                    "weburl": metadata.weburl,
+                    "company": metadata.company,
+                    "company_website": metadata.company_website,
+                    "category_ids": metadata.categories,  # List of category IDs
+                    "logo_key": metadata.logo_key,
+                    "logo_url": metadata.logo_url
+                }
+
+            documents.append(
+                (final_text, source_name, product_id, category, extracted_metadata))
 
-            success = await self.lightrag_client.insert_text_with_source(
-                # No single product_id for combined batch
-                final_text, source_name, None, category)
-            if not success:
-                raise Exception(
-                    f"Failed to insert batch {batch_id} into LightRAG")
+        # Enqueue the whole batch and drain the pipeline once so LightRAG
+        # overlaps extraction and embedding across products
+        failed = await self.lightrag_client.insert_texts_with_sources(documents, batch_id)
+        if failed:
+            raise Exception(
+                f"Failed to insert {len(failed)}/{len(documents)} products from batch {batch_id} into LightRAG: {', '.join(map(str, failed))}")
+
+        logger.info("✅ %d products from batch %s processed",
+                    len(documents), batch_id)
 
     def _generate_metadata_summary(self, metadata_list: List[EnhancedProductMetadata]) -> Dict[str, Any]:
         """Generate comprehensive metadata summary for the batch"""
         if not metadata_list:
             return {}
 
-        # Initialize counters
-        categories = defaultdict(int)
-        companies = defaultdict(int)
-        price_ranges = defaultdict(int)
-        rating_tiers = defaultdict(int)
-        market_positions = defaultdict(int)
-        feature_richness = defaultdict(int)
-        industries = defaultdict(int)
+        # Distribution counters (Counter.update runs in C)
+        categories = Counter()
+        industries = Counter()
 
         # Aggregate statistics
         total_features = 0
@@ -286,40 +368,31 @@ class BatchProcessor:
         rating_sum = 0.0
         rated_products = 0
 
-        for metadata in metadata_list:
-            # Category distribution
-            for category in metadata.categories:
-                categories[category] += 1
-
-            # Company distribution
-            companies[metadata.company] += 1
+        # Local aliases for the per-product loop
+        categories_update = categories.update
+        industries_update = industries.update
+        _len = len
 
-            # Price range distribution
-            price_ranges[metadata.price_range] += 1
-
-            # Rating tier distribution
-            rating_tiers[metadata.rating_tier] += 1
-
-            # Market position distribution
-            market_positions[metadata.market_position] += 1
-
-            # Feature richness distribution
-            feature_richness[metadata.feature_richness] += 1
-
-            # Industry distribution
-            for industry in metadata.industry:
-                industries[industry] += 1
+        for metadata in metadata_list:
+            categories_update(metadata.categories)
+            industries_update(metadata.industry or ())
 
-            # Aggregate stats
-            total_features += len(metadata.features) + \
-                len(metadata.other_features)
-            total_integrations += len(metadata.integrations)
+            total_features += _len(metadata.features) + \
+                _len(metadata.other_features)
+            total_integrations += _len(metadata.integrations)
             total_reviews += metadata.total_reviews
 
             if metadata.overall_rating > 0:
                 rating_sum += metadata.overall_rating
                 rated_products += 1
 
+        # Scalar distributions
+        companies = Counter(m.company for m in metadata_list)
+        price_ranges = Counter(m.price_range for m in metadata_list)
+        rating_tiers = Counter(m.rating_tier for m in metadata_list)
+        market_positions = Counter(m.market_position for m in metadata_list)
+        feature_richness = Counter(m.feature_richness for m in metadata_list)
+
         # Calculate averages
         avg_rating = rating_sum / rated_products if rated_products > 0 else 0.0
         avg_features = total_features / \
@@ -4,10 +4,15 @@ Utility modules for product ingestion
 
 from .objectid_utils import ObjectIdUtils, safe_str, safe_get_oid
 from .name_resolution import NameResolver
+from .rate_limit import TokenBucket
+from .serialization import json_dumps, json_loads
 
 __all__ = [
     'ObjectIdUtils',
     'safe_str',
     'safe_get_oid',
-    'NameResolver'
+    'NameResolver',
+    'TokenBucket',
+    'json_dumps',
+    'json_loads'
 ]
@@ -5,13 +5,42 @@ This module provides functions to resolve various ID references in product docum
 to their corresponding names from lookup collections.
 """
 
+import asyncio
 import logging
+import time
 from typing import Dict, List, Optional, Any
 from bson import ObjectId
 from pymongo.database import Database
 
 logger = logging.getLogger(__name__)
 
+# Documents per cursor batch when loading a whole lookup collection; large
+# enough that a typical table arrives in a single round trip
+LOOKUP_FETCH_BATCH_SIZE = 5000
+
+# Seconds after a failed full-collection load before another one is tried;
+# prefetch() keeps resolving IDs with $in queries in between
+LOAD_RETRY_SECONDS = 60.0
+
+
+def _id_candidates(value: Any) -> List[Any]:
+    """
+    `_id` values a referenced ID can match in a `$in` query
+
+    References are often stored as 24-hex strings or extended-JSON
+    `{'$oid': ...}` dicts, which never equal an ObjectId `_id`; both are
+    queried in ObjectId form as well (strings also as-is, for collections
+    keyed by string).
+    """
+    if isinstance(value, dict):
+        value = value.get('$oid')
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            return [ObjectId(value)]
+        return []
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return [value, ObjectId(value)]
+    return [value]
+
 
 class NameResolver:
     """
@@ -20,6 +49,18 @@ class NameResolver:
     Provides caching and batch resolution for efficient lookups.
     """
 
+    # Lookup collection and name field behind each cache
+    _COLLECTIONS = {
+        'features': ('Features', 'name'),
+        'parent_categories': ('ParentCategory', 'name'),
+        'sub_categories': ('SubCategory', 'name'),
+        'parent_industries': ('ParentIndustry', 'name'),
+        'supports': ('Supports', 'name'),
+        'languages': ('Languages', 'name'),
+        'techstack': ('Techstack', 'name'),
+        'companies': ('Company', 'name'),
+    }
+
     def __init__(self, db: Database):
         """
         Initialize the name resolver with a MongoDB database connection.
@@ -48,53 +89,167 @@ class NameResolver:
             'techstack': False,
             'companies': False
         }
+        # IDs a prefetch looked up and found no name for
+        self._missing = {collection_type: set() for collection_type in self._cache}
+        # Monotonic time of each collection's last failed full load
+        self._load_failed_at = dict.fromkeys(self._cache, None)
+
+    @classmethod
+    def from_snapshot(cls, caches: Dict[str, Dict[str, str]]) -> "NameResolver":
+        """
+        Database-free resolver over names resolved elsewhere (see snapshot())
 
-    def _load_cache(self, collection_type: str, collection_name: str, name_field: str = 'name'):
-        """Load all documents from a collection into cache"""
+        Used in worker processes, which cannot share the MongoDB connection;
+        IDs missing from the snapshot are treated as unknown.
+        """
+        resolver = cls(None)
+        for collection_type, names in caches.items():
+            resolver._cache[collection_type] = names
+        resolver._cache_loaded = dict.fromkeys(resolver._cache_loaded, True)
+        return resolver
+
+    def snapshot(self, collection_type: str, ids: List[Any]) -> Dict[str, str]:
+        """Resolve `ids` and return just their names, small enough to pickle"""
+        collection_name, name_field = self._COLLECTIONS[collection_type]
+        self._load_cache(collection_type, collection_name, name_field, ids)
+        cache = self._cache[collection_type]
+        return {key: cache[key] for key in map(str, ids) if key in cache}
+
+    def _load_cache(self, collection_type: str, collection_name: str, name_field: str = 'name',
+                    ids: Optional[List[Any]] = None):
+        """Load all documents from a collection into cache
+
+        Skipped when every one of `ids` was already resolved by prefetch(),
+        and for LOAD_RETRY_SECONDS after a failed load.
+        """
         if self._cache_loaded[collection_type]:
             return
 
+        failed_at = self._load_failed_at[collection_type]
+        if failed_at is not None and time.monotonic() - failed_at < LOAD_RETRY_SECONDS:
+            return
+
+        if ids is not None:
+            cache = self._cache[collection_type]
+            missing = self._missing[collection_type]
+            if all((key := str(i)) in cache or key in missing for i in ids):
+                return
+
         try:
             collection = self.db[collection_name]
-            documents = collection.find({}, {'_id': 1, name_field: 1})
-
-            for doc in documents:
-                if name_field in doc and doc[name_field]:
-                    self._cache[collection_type][str(
-                        doc['_id'])] = doc[name_field]
+            # The server drops documents without a usable name; the result
+            # holds every name prefetch() could have found, so it replaces
+            # the cache
+            documents = collection.find(
+                {name_field: {'$nin': [None, '']}},
+                {'_id': 1, name_field: 1}).batch_size(LOOKUP_FETCH_BATCH_SIZE)
+            self._cache[collection_type] = {
+                str(doc['_id']): doc[name_field] for doc in documents}
 
             self._cache_loaded[collection_type] = True
+            self._load_failed_at[collection_type] = None
             logger.debug(
                 f"Loaded {len(self._cache[collection_type])} {collection_type} into cache")
 
         except Exception as e:
-            logger.warning(f"Failed to load {collection_type} cache: {e}")
+            # Don't repeat the full-collection scan per product; prefetch()
+            # still resolves batches and the load is retried later
+            self._load_failed_at[collection_type] = time.monotonic()
+            logger.warning(
+                f"Failed to load {collection_type} cache, retrying in {LOAD_RETRY_SECONDS:.0f}s: {e}")
 
-    def resolve_feature_ids(self, feature_ids: List[Any]) -> List[str]:
+    async def preload_all(self, collection_types: Optional[List[str]] = None):
         """
-        Resolve feature ObjectIds to feature names.
+        Load whole lookup collections up front, all queries in flight at once
+
+        After this, prefetch() and resolve_* never touch MongoDB for these
+        types. Lookup tables are small enough to hold in memory.
 
         Args:
-            feature_ids: List of ObjectIds or strings representing features
+            collection_types: Cache names to load (defaults to all of _COLLECTIONS)
+        """
+        await asyncio.gather(*[
+            asyncio.to_thread(self._load_cache, collection_type,
+                              *self._COLLECTIONS[collection_type])
+            for collection_type in collection_types or self._COLLECTIONS
+        ])
+
+    def prefetch(self, collection_type: str, ids: List[Any]):
+        """
+        Resolve a batch's IDs with one `$in` query instead of a full collection scan
+
+        Afterwards resolve_* calls for these IDs are pure cache hits.
+
+        Args:
+            collection_type: Cache name (a key of _COLLECTIONS)
+            ids: ObjectIds or strings referenced by the batch
+        """
+        if self._cache_loaded[collection_type]:
+            return
+
+        cache = self._cache[collection_type]
+        missing = self._missing[collection_type]
+        wanted = {}
+        for value in ids:
+            key = str(value)
+            if key not in cache and key not in missing:
+                wanted[key] = value
+        if not wanted:
+            return
+
+        collection_name, name_field = self._COLLECTIONS[collection_type]
+        query_ids = [candidate for value in wanted.values()
+                     for candidate in _id_candidates(value)]
+        try:
+            documents = self.db[collection_name].find(
+                {'_id': {'$in': query_ids}}, {'_id': 1, name_field: 1})
+            for doc in documents:
+                if doc.get(name_field):
+                    cache[str(doc['_id'])] = doc[name_field]
+        except Exception as e:
+            # resolve_* falls back to loading the whole collection
+            logger.warning(f"Failed to prefetch {collection_type}: {e}")
+            return
+
+        missing.update(key for key in wanted if key not in cache)
+        logger.debug(
+            f"Prefetched {len(wanted)} {collection_type} IDs with one query")
+
+    def _resolve(self, collection_type: str, ids: List[Any]) -> List[str]:
+        """
+        Resolve IDs to names through one cache, dropping IDs without a name.
+
+        Args:
+            collection_type: Cache name (a key of _COLLECTIONS)
+            ids: List of ObjectIds or strings
 
         Returns:
-            List of feature names
+            List of names, in the order of `ids`
         """
-        if not feature_ids:
+        if not ids:
             return []
 
-        self._load_cache('features', 'Features', 'name')
+        collection_name, name_field = self._COLLECTIONS[collection_type]
+        self._load_cache(collection_type, collection_name, name_field, ids)
+
+        cache = self._cache[collection_type]
+        if logger.isEnabledFor(logging.DEBUG):
+            for key in map(str, ids):
+                if key not in cache:
+                    logger.debug(f"{collection_type} ID not found in cache: {key}")
+        return [name for name in map(cache.get, map(str, ids)) if name is not None]
 
-        resolved_names = []
-        for feature_id in feature_ids:
-            feature_id_str = str(feature_id)
-            if feature_id_str in self._cache['features']:
-                resolved_names.append(self._cache['features'][feature_id_str])
-            else:
-                logger.debug(
-                    f"Feature ID not found in cache: {feature_id_str}")
+    def resolve_feature_ids(self, feature_ids: List[Any]) -> List[str]:
+        """
+        Resolve feature ObjectIds to feature names.
 
-        return resolved_names
+        Args:
+            feature_ids: List of ObjectIds or strings representing features
+
+        Returns:
+            List of feature names
+        """
+        return self._resolve('features', feature_ids)
 
     def resolve_parent_category_ids(self, category_ids: List[Any]) -> List[str]:
         """
@@ -106,22 +261,7 @@ class NameResolver:
         Returns:
             List of parent category names
         """
-        if not category_ids:
-            return []
-
-        self._load_cache('parent_categories', 'ParentCategory', 'name')
-
-        resolved_names = []
-        for category_id in category_ids:
-            category_id_str = str(category_id)
-            if category_id_str in self._cache['parent_categories']:
-                resolved_names.append(
-                    self._cache['parent_categories'][category_id_str])
-            else:
-                logger.debug(
-                    f"Parent category ID not found in cache: {category_id_str}")
-
-        return resolved_names
+        return self._resolve('parent_categories', category_ids)
 
     def resolve_sub_category_ids(self, category_ids: List[Any]) -> List[str]:
         """
@@ -133,22 +273,7 @@ class NameResolver:
         Returns:
             List of sub category names
         """
-        if not category_ids:
-            return []
-
-        self._load_cache('sub_categories', 'SubCategory', 'name')
-
-        resolved_names = []
-        for category_id in category_ids:
-            category_id_str = str(category_id)
-            if category_id_str in self._cache['sub_categories']:
-                resolved_names.append(
-                    self._cache['sub_categories'][category_id_str])
-            else:
-                logger.debug(
-                    f"Sub category ID not found in cache: {category_id_str}")
-
-        return resolved_names
+        return self._resolve('sub_categories', category_ids)
 
     def resolve_industry_ids(self, industry_ids: List[Any]) -> List[str]:
         """
@@ -160,22 +285,7 @@ class NameResolver:
         Returns:
             List of industry names
         """
-        if not industry_ids:
-            return []
-
-        self._load_cache('parent_industries', 'ParentIndustry', 'name')
-
-        resolved_names = []
-        for industry_id in industry_ids:
-            industry_id_str = str(industry_id)
-            if industry_id_str in self._cache['parent_industries']:
-                resolved_names.append(
-                    self._cache['parent_industries'][industry_id_str])
-            else:
-                logger.debug(
-                    f"Industry ID not found in cache: {industry_id_str}")
-
-        return resolved_names
+        return self._resolve('parent_industries', industry_ids)
 
     def resolve_support_ids(self, support_ids: List[Any]) -> List[str]:
         """
@@ -187,21 +297,7 @@ class NameResolver:
         Returns:
             List of support platform names
         """
-        if not support_ids:
-            return []
-
-        self._load_cache('supports', 'Supports', 'name')
-
-        resolved_names = []
-        for support_id in support_ids:
-            support_id_str = str(support_id)
-            if support_id_str in self._cache['supports']:
-                resolved_names.append(self._cache['supports'][support_id_str])
-            else:
-                logger.debug(
-                    f"Support ID not found in cache: {support_id_str}")
-
-        return resolved_names
+        return self._resolve('supports', support_ids)
 
     def resolve_language_ids(self, language_ids: List[Any]) -> List[str]:
         """
@@ -213,22 +309,7 @@ class NameResolver:
         Returns:
             List of language names
         """
-        if not language_ids:
-            return []
-
-        self._load_cache('languages', 'Languages', 'name')
-
-        resolved_names = []
-        for language_id in language_ids:
-            language_id_str = str(language_id)
-            if language_id_str in self._cache['languages']:
-                resolved_names.append(
-                    self._cache['languages'][language_id_str])
-            else:
-                logger.debug(
-                    f"Language ID not found in cache: {language_id_str}")
-
-        return resolved_names
+        return self._resolve('languages', language_ids)
 
     def resolve_techstack_ids(self, techstack_ids: List[Any]) -> List[str]:
         """
@@ -240,21 +321,7 @@ class NameResolver:
         Returns:
             List of technology names
         """
-        if not techstack_ids:
-            return []
-
-        self._load_cache('techstack', 'Techstack', 'name')
-
-        resolved_names = []
-        for tech_id in techstack_ids:
-            tech_id_str = str(tech_id)
-            if tech_id_str in self._cache['techstack']:
-                resolved_names.append(self._cache['techstack'][tech_id_str])
-            else:
-                logger.debug(
-                    f"Tech stack ID not found in cache: {tech_id_str}")
-
-        return resolved_names
+        return self._resolve('techstack', techstack_ids)
 
     def resolve_company_id(self, company_id: Any) -> Optional[str]:
         """
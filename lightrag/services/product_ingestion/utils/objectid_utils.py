@@ -11,6 +11,39 @@ from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 
+# Product documents reference the same category/industry/company ids over and
+# over; keep their string forms (bounded, oldest entries evicted first)
+_OID_CACHE: Dict[bytes, str] = {}
+_OID_CACHE_MAX = 65536
+
+
+def _oid_str(oid: ObjectId) -> str:
+    """Cached str() of an ObjectId, keyed by its 12-byte binary"""
+    key = oid.binary
+    text = _OID_CACHE.get(key)
+    if text is None:
+        if len(_OID_CACHE) >= _OID_CACHE_MAX:
+            # dicts keep insertion order, so this drops the oldest entry;
+            # extraction runs in worker threads, so tolerate a racing evictor
+            try:
+                del _OID_CACHE[next(iter(_OID_CACHE))]
+            except (KeyError, RuntimeError, StopIteration):
+                pass
+        # Same 24-char lowercase hex as str(oid), without the binascii detour
+        text = _OID_CACHE[key] = key.hex()
+    return text
+
+
+# Converters for the common exact types seen in product documents. bool maps
+# to str like the isinstance chain below, where the int check matches first.
+_STR_HANDLERS = {
+    str: lambda obj: obj,
+    ObjectId: _oid_str,
+    int: str,
+    float: str,
+    bool: str,
+}
+
 
 def safe_str(obj: Any, default: str = "") -> str:
     """
@@ -26,8 +59,13 @@ def safe_str(obj: Any, default: str = "") -> str:
     if obj is None:
         return default
 
+    # Exact-type fast path: one dict probe instead of the isinstance chain
+    handler = _STR_HANDLERS.get(type(obj))
+    if handler is not None:
+        return handler(obj)
+
     if isinstance(obj, ObjectId):
-        return str(obj)
+        return _oid_str(obj)
 
     if isinstance(obj, dict) and '$oid' in obj:
         return str(obj['$oid'])
@@ -42,8 +80,9 @@ def safe_str(obj: Any, default: str = "") -> str:
         return str(obj).lower()
 
     if isinstance(obj, (list, tuple)):
-        logger.warning(
-            f"Attempting to convert list/tuple to string: {obj[:3] if len(obj) > 3 else obj}...")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                f"Attempting to convert list/tuple to string: {obj[:3] if len(obj) > 3 else obj}...")
         return str(obj)
 
     # For other types, convert to string safely
@@ -73,7 +112,7 @@ def safe_get_oid(data: Dict[str, Any], field: str, default: str = "unknown") ->
             return default
 
         if isinstance(value, ObjectId):
-            return str(value)
+            return _oid_str(value)
 
         if isinstance(value, dict) and '$oid' in value:
             return str(value['$oid'])
@@ -104,15 +143,25 @@ def safe_str_list(obj_list: List[Any], default: Optional[List[str]] = None) -> L
         logger.warning(f"Expected list but got {type(obj_list)}: {obj_list}")
         return default or []
 
+    # Already all strings: copy so callers never share the source document's list
+    if all(type(obj) is str for obj in obj_list):
+        return list(obj_list)
+
+    # Skip None values but allow empty strings
+    try:
+        return [safe_str(obj) for obj in obj_list if obj is not None]
+    except Exception:
+        pass
+
+    # Slow path: convert element by element, dropping the ones that fail
     result = []
     for obj in obj_list:
-        if obj is not None:  # Skip None values but allow empty strings
+        if obj is not None:
             try:
                 result.append(safe_str(obj))
             except Exception as e:
                 logger.warning(
                     f"Error converting object to string: {obj}, error: {e}")
-                continue
 
     return result
 
@@ -216,25 +265,17 @@ class ObjectIdUtils:
         if not integrations:
             return []
 
-        result = []
-        for integration in integrations:
-            if isinstance(integration, dict):
-                name = integration.get('name', 'Unknown Integration')
-                website = integration.get('website', '')
-                integration_dict = {
-                    'name': safe_str(name),
-                    'website': safe_str(website)
-                }
-                result.append(integration_dict)
-            else:
-                # Handle case where integration is already a string
-                integration_dict = {
-                    'name': safe_str(integration),
-                    'website': ''
-                }
-                result.append(integration_dict)
-
-        return result
+        # Non-dict entries are bare integration names
+        return [
+            {
+                'name': safe_str(integration.get('name', 'Unknown Integration')),
+                'website': safe_str(integration.get('website', ''))
+            } if isinstance(integration, dict) else {
+                'name': safe_str(integration),
+                'website': ''
+            }
+            for integration in integrations
+        ]
 
     @staticmethod
     def extract_pricing_summary(pricing_data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -254,25 +295,31 @@ class ObjectIdUtils:
 
         for plan in pricing_data:
             if isinstance(plan, dict):
-                plan_name = plan.get('plan', '')
-                is_free = plan.get('isPlanFree', False)
-                amount = plan.get('amount', 0)
-                plan_currency = plan.get('currency', 'USD')
-
-                # Keep plan as dictionary for normalizer, but ensure all values are strings
+                get = plan.get
+                plan_name = get('plan', '')
+                is_free = get('isPlanFree', False)
+                amount = get('amount', 0)
+                plan_currency = get('currency', 'USD')
+                period = get('period', 'Month')
+
+                # Keep plan as dictionary for normalizer, but ensure all values
+                # are strings (values already stored as str skip safe_str)
+                plan_name_str = plan_name if type(
+                    plan_name) is str else safe_str(plan_name)
                 plan_dict = {
-                    'plan': safe_str(plan_name),
-                    'amount': safe_str(amount),
-                    'currency': safe_str(plan_currency),
-                    'period': safe_str(plan.get('period', 'Month')),
+                    'plan': plan_name_str,
+                    'amount': amount if type(amount) is str else safe_str(amount),
+                    'currency': plan_currency if type(plan_currency) is str else safe_str(plan_currency),
+                    'period': period if type(period) is str else safe_str(period),
                     'isPlanFree': is_free
                 }
                 plans.append(plan_dict)
 
-                if is_free or (amount and str(amount) == '0'):
+                # Only a truthy amount whose text is exactly '0' counts as free
+                if not has_free and (is_free or (amount and str(amount) == '0')):
                     has_free = True
 
-                if plan_name and 'custom' in plan_name.lower():
+                if not custom_pricing and plan_name_str and 'custom' in plan_name_str.lower():
                     custom_pricing = True
 
                 if plan_currency:
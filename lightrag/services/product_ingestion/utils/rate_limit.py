@@ -0,0 +1,49 @@
+"""Client-side rate limiting for Azure OpenAI deployments"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket for a deployment's tokens-per-minute and requests-per-minute limits
+
+    Callers wait here, on the client, when the budget is spent, instead of
+    sending requests that Azure answers with 429 and a retry-after delay.
+    Both budgets refill continuously from the monotonic clock.
+    """
+
+    def __init__(self, tpm: int, rpm: int):
+        self.tpm = tpm
+        self.rpm = rpm
+        self._tokens = float(tpm)
+        self._requests = float(rpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Add the budget accrued since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until one request of `tokens` estimated tokens fits the budget"""
+        # A request larger than a whole minute's budget still goes through
+        # once the bucket is full
+        tokens = min(tokens, self.tpm)
+
+        # Waiters are served in arrival order while holding the lock
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens and self._requests >= 1:
+                    self._tokens -= tokens
+                    self._requests -= 1
+                    return
+                await asyncio.sleep(max(
+                    (tokens - self._tokens) * 60 / self.tpm,
+                    (1 - self._requests) * 60 / self.rpm,
+                ))
@@ -0,0 +1,41 @@
+"""JSON encoding for ingestion state files and job results"""
+
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup; fall back to the stdlib json module
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize result records (ProductError, metadata dataclasses, datetimes)"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, with orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_json_default, option=option)
+    return json.dumps(
+        data, indent=2 if indent else None, default=_json_default).encode()
+
+
+def json_loads(raw: bytes) -> Any:
+    """Parse JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
@@ -15,54 +15,69 @@ Use Cases:
 """
 
 import os
+import time
+import base64
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
-from datetime import datetime
-import json
+import multiprocessing
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from itertools import islice
 
 from dotenv import load_dotenv
 from pymongo import MongoClient
 import certifi
 import numpy as np
-from openai import OpenAI, AzureOpenAI
+from openai import AsyncAzureOpenAI
 
 from lightrag import LightRAG, QueryParam
 from lightrag.utils import EmbeddingFunc
 from lightrag.kg.shared_storage import initialize_pipeline_status
+from lightrag.services.product_ingestion.models.config import IngestionConfig
+from lightrag.services.product_ingestion.models.metadata import ProductMetadata
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class ProductMetadata:
-    """Structured metadata for product filtering and context"""
-    product_id: str
-    category: str
-    brand: str
-    price: float
-    price_range: str  # "budget", "mid-range", "premium", "luxury"
-    availability: str
-    rating: float
-    rating_tier: str  # "excellent", "good", "average", "poor"
-    feature_count: int
-    specification_count: int
-
-
-@dataclass
-class IngestionConfig:
-    """Configuration for the ingestion process"""
-    batch_size: int = 1
-    max_workers: int = 5
-    chunk_size: int = 1000
-    chunk_overlap: int = 200
-    working_dir: str = "./product_rag_storage"
+# Fields read by ProductNormalizer.normalize_product (_id is always returned)
+PRODUCT_PROJECTION = {
+    'name': 1, 'category': 1, 'brand': 1, 'price': 1, 'description': 1,
+    'features': 1, 'specifications': 1, 'availability': 1, 'rating': 1,
+}
+
+# Bucket boundaries for ProductNormalizer: a value lands in the label at
+# bisect_right(bins, value), so each boundary belongs to the higher bucket
+PRICE_BINS = (50, 200, 1000)
+PRICE_LABELS = ("budget", "mid-range", "premium", "luxury")
+RATING_BINS = (2.5, 3.5, 4.5)
+RATING_LABELS = ("poor", "average", "good", "excellent")
+
+# Stand-in for a batch result without a metadata summary (read only)
+_EMPTY_SUMMARY: Dict[str, Any] = {}
+
+# Pool workers start from a clean server process rather than a fork of this
+# multithreaded one, whose locks a forked child could inherit held
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# Environment variables the Azure LLM and embedding clients need
+AZURE_ENV_VARS = (
+    "LLM_BINDING_API_KEY",
+    "AZURE_OPENAI_API_VERSION",
+    "LLM_BINDING_HOST",
+    "AZURE_OPENAI_DEPLOYMENT",
+    "AZURE_EMBEDDING_API_KEY",
+    "AZURE_EMBEDDING_API_VERSION",
+    "AZURE_EMBEDDING_ENDPOINT",
+    "AZURE_EMBEDDING_DEPLOYMENT",
+)
+
+# Azure OpenAI accepts at most this many inputs per embeddings request
+AZURE_EMBEDDING_MAX_INPUTS = 2048
 
 
 class ProductNormalizer:
@@ -71,29 +86,19 @@ class ProductNormalizer:
     @staticmethod
     def categorize_price(price: float) -> str:
         """Categorize price into ranges for metadata filtering"""
-        if price < 50:
-            return "budget"
-        elif price < 200:
-            return "mid-range"
-        elif price < 1000:
-            return "premium"
-        else:
-            return "luxury"
+        return PRICE_LABELS[bisect_right(PRICE_BINS, price)]
 
     @staticmethod
     def categorize_rating(rating: float) -> str:
         """Categorize rating into tiers for metadata filtering"""
-        if rating >= 4.5:
-            return "excellent"
-        elif rating >= 3.5:
-            return "good"
-        elif rating >= 2.5:
-            return "average"
-        else:
+        if rating != rating:  # NaN compares false everywhere; old chain said "poor"
             return "poor"
+        return RATING_LABELS[bisect_right(RATING_BINS, rating)]
 
     @classmethod
-    def normalize_product(cls, product_json: Dict[str, Any]) -> Tuple[str, ProductMetadata]:
+    def normalize_product(cls, product_json: Dict[str, Any],
+                          price: Optional[float] = None,
+                          rating: Optional[float] = None) -> Tuple[str, ProductMetadata]:
         """
         Convert product JSON to LightRAG-friendly text with metadata
 
@@ -102,21 +107,25 @@ class ProductNormalizer:
         2. Relationship detection (product-feature, brand-category, etc.)
         3. Knowledge graph construction for complex RFP queries
         4. Effective embeddings for semantic search
+
+        price and rating may be passed pre-converted (see extract_numeric_fields)
         """
 
         # Extract core fields with defaults
         name = product_json.get('name', 'Unknown Product')
         category = product_json.get('category', 'Uncategorized')
         brand = product_json.get('brand', 'Unknown Brand')
-        price = float(product_json.get('price', 0))
+        if price is None:
+            price = float(product_json.get('price', 0))
         description = product_json.get('description', '')
         features = product_json.get('features', [])
         specifications = product_json.get('specifications', [])
         availability = product_json.get('availability', 'Unknown')
-        rating = float(product_json.get('rating', 0))
+        if rating is None:
+            rating = float(product_json.get('rating', 0))
 
         # Create rich, structured text for LLM processing
-        normalized_text = f"""Product Information:
+        parts = [f"""Product Information:
 
 Name: {name}
 Category: {category}
@@ -128,36 +137,45 @@ Customer Rating: {rating}/5.0 stars
 Product Description:
 {description}
 
-Key Features:"""
+Key Features:"""]
 
         # Add features with context
         if features:
-            for i, feature in enumerate(features, 1):
-                normalized_text += f"\n{i}. {feature}"
+            parts.extend(f"{i}. {feature}" for i,
+                         feature in enumerate(features, 1))
         else:
-            normalized_text += "\nNo specific features listed."
+            parts.append("No specific features listed.")
 
-        normalized_text += "\n\nTechnical Specifications:"
+        parts.append("\nTechnical Specifications:")
 
         # Add specifications with structured format
         if specifications:
-            for spec in specifications:
-                if isinstance(spec, dict):
-                    spec_name = spec.get('name', 'Unknown Specification')
-                    spec_value = spec.get('value', 'Not specified')
-                    normalized_text += f"\n- {spec_name}: {spec_value}"
-                else:
-                    normalized_text += f"\n- {spec}"
+            if all(type(spec) is dict for spec in specifications):
+                # Homogeneous name/value documents (the usual Mongo schema)
+                parts.extend(
+                    f"- {spec.get('name', 'Unknown Specification')}: {spec.get('value', 'Not specified')}"
+                    for spec in specifications)
+            else:
+                for spec in specifications:
+                    if isinstance(spec, dict):
+                        spec_name = spec.get('name', 'Unknown Specification')
+                        spec_value = spec.get('value', 'Not specified')
+                        parts.append(f"- {spec_name}: {spec_value}")
+                    else:
+                        parts.append(f"- {spec}")
         else:
-            normalized_text += "\nNo technical specifications provided."
+            parts.append("No technical specifications provided.")
 
         # Add contextual information for relationship extraction
-        normalized_text += f"""
-
+        category_lower = category.lower()
+        price_range = cls.categorize_price(price)
+        parts.append(f"""
 Product Context:
-This {category.lower()} product is manufactured by {brand} and is currently {availability.lower()}. 
-With a customer rating of {rating}/5.0, it represents a {cls.categorize_price(price)} option in the {category.lower()} market segment.
-The product offers {len(features)} key features and {len(specifications)} technical specifications."""
+This {category_lower} product is manufactured by {brand} and is currently {availability.lower()}. 
+With a customer rating of {rating}/5.0, it represents a {price_range} option in the {category_lower} market segment.
+The product offers {len(features)} key features and {len(specifications)} technical specifications.""")
+
+        normalized_text = "\n".join(parts)
 
         # Create metadata for filtering and context
         metadata = ProductMetadata(
@@ -165,7 +183,7 @@ The product offers {len(features)} key features and {len(specifications)} techni
             category=category,
             brand=brand,
             price=price,
-            price_range=cls.categorize_price(price),
+            price_range=price_range,
             availability=availability,
             rating=rating,
             rating_tier=cls.categorize_rating(rating),
@@ -175,14 +193,37 @@ The product offers {len(features)} key features and {len(specifications)} techni
 
         return normalized_text, metadata
 
+    @staticmethod
+    def extract_numeric_fields(products: List[Dict[str, Any]]) -> Tuple[Optional[List[float]], Optional[List[float]]]:
+        """
+        Convert a batch's prices and ratings to floats in one numpy pass
+
+        Returns (None, None) when any value needs the per-product float()
+        path (missing/None or unparsable), so those products still surface
+        their own conversion error.
+        """
+        try:
+            prices = np.array([p.get('price', 0) for p in products], dtype=np.float64)
+            ratings = np.array([p.get('rating', 0) for p in products], dtype=np.float64)
+        except (TypeError, ValueError, AttributeError):
+            return None, None
+
+        # None converts to NaN here but raised in float(); defer to that path
+        if np.isnan(prices).any() or np.isnan(ratings).any():
+            return None, None
+        return prices.tolist(), ratings.tolist()
+
 
 class ProductIngestionService:
     """Main service for ingesting products into LightRAG"""
 
     def __init__(self, config: IngestionConfig = None):
-        self.config = config or IngestionConfig()
+        # Defaults of this service's former config: five concurrent batches
+        self.config = config or IngestionConfig(
+            max_workers=5, working_dir="./product_rag_storage")
         self.normalizer = ProductNormalizer()
         self.rag: Optional[LightRAG] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
 
         # Initialize clients
         self._init_mongodb_client()
@@ -211,13 +252,29 @@ class ProductIngestionService:
     def _init_llm_and_embedding_functions(self):
         """Initialize LLM and embedding functions"""
 
+        # Read settings once and fail at startup rather than mid-batch
+        env = {name: os.getenv(name) for name in AZURE_ENV_VARS}
+        missing = [name for name, value in env.items() if not value]
+        if missing:
+            raise ValueError(
+                f"Missing required Azure OpenAI environment variables: {', '.join(missing)}")
+
+        # Build the Azure clients once so their connection pools are reused
+        self._azure_llm = AsyncAzureOpenAI(
+            api_key=env["LLM_BINDING_API_KEY"],
+            api_version=env["AZURE_OPENAI_API_VERSION"],
+            azure_endpoint=env["LLM_BINDING_HOST"],
+        )
+        self._azure_embed = AsyncAzureOpenAI(
+            api_key=env["AZURE_EMBEDDING_API_KEY"],
+            api_version=env["AZURE_EMBEDDING_API_VERSION"],
+            azure_endpoint=env["AZURE_EMBEDDING_ENDPOINT"],
+        )
+        self._llm_model = env["AZURE_OPENAI_DEPLOYMENT"]
+        self._embed_model = env["AZURE_EMBEDDING_DEPLOYMENT"]
+
         # Azure OpenAI LLM function
         async def azure_openai_llm_func(prompt, system_prompt=None, history_messages=[], **kwargs) -> str:
-            client = AzureOpenAI(
-                api_key=os.getenv("LLM_BINDING_API_KEY"),
-                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-                azure_endpoint=os.getenv("LLM_BINDING_HOST"),
-            )
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
@@ -225,27 +282,34 @@ class ProductIngestionService:
                 messages.extend(history_messages)
             messages.append({"role": "user", "content": prompt})
 
-            response = client.chat.completions.create(
-                model=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
+            response = await self._azure_llm.chat.completions.create(
+                model=self._llm_model,
                 messages=messages,
                 temperature=kwargs.get("temperature", 0),
                 max_completion_tokens=kwargs.get("max_tokens", 1000),
             )
             return response.choices[0].message.content
 
-        # Azure embedding function
+        # Azure embedding function: one request per AZURE_EMBEDDING_MAX_INPUTS texts
         async def azure_embedding_func(texts: List[str]) -> np.ndarray:
-            client = AzureOpenAI(
-                api_key=os.getenv("AZURE_EMBEDDING_API_KEY"),
-                api_version=os.getenv("AZURE_EMBEDDING_API_VERSION"),
-                azure_endpoint=os.getenv("AZURE_EMBEDDING_ENDPOINT"),
-            )
-            response = client.embeddings.create(
-                model=os.getenv("AZURE_EMBEDDING_DEPLOYMENT"),
-                input=texts
-            )
-            embeddings = [item.embedding for item in response.data]
-            return np.array(embeddings)
+            embeddings = None
+            for start in range(0, len(texts), AZURE_EMBEDDING_MAX_INPUTS):
+                # base64 vectors decode straight into float32 rows
+                response = await self._azure_embed.embeddings.create(
+                    model=self._embed_model,
+                    input=texts[start:start + AZURE_EMBEDDING_MAX_INPUTS],
+                    encoding_format="base64",
+                )
+                for row, item in enumerate(response.data, start):
+                    vector = np.frombuffer(
+                        base64.b64decode(item.embedding), dtype=np.float32)
+                    if embeddings is None:
+                        embeddings = np.empty(
+                            (len(texts), vector.size), dtype=np.float32)
+                    embeddings[row] = vector
+            if embeddings is None:
+                return np.empty((0, 0), dtype=np.float32)
+            return embeddings
 
         self.llm_func = azure_openai_llm_func
         self.embedding_func = azure_embedding_func
@@ -290,6 +354,9 @@ class ProductIngestionService:
             vector_storage=vector_storage,
             graph_storage=graph_storage,
             doc_status_storage=doc_status_storage,
+            # Send many chunks per embeddings request instead of LightRAG's default of 10
+            embedding_batch_num=get_env_value(
+                "EMBEDDING_BATCH_NUM", 256, int),
             log_level="INFO",
         )
 
@@ -301,27 +368,34 @@ class ProductIngestionService:
             f"✅ LightRAG initialized with working directory: {self.config.working_dir}")
         return self.rag
 
-    def fetch_products(self, database: str, collection: str,
-                       filter_query: Dict = None, limit: int = None) -> List[Dict]:
-        """Fetch products from MongoDB"""
+    def iter_products(self, database: str, collection: str,
+                      filter_query: Dict = None, limit: int = None) -> Iterator[Dict]:
+        """Stream products from MongoDB, fetching only the fields the normalizer reads"""
         db = self.product_mongo_client[database]
         coll = db[collection]
 
         query = filter_query or {}
-        cursor = coll.find(query)
+        cursor = coll.find(query, projection=PRODUCT_PROJECTION).batch_size(
+            max(self.config.batch_size, 100))
 
         if limit:
             cursor = cursor.limit(limit)
 
-        products = list(cursor)
-        logger.info(
-            f"📦 Fetched {len(products)} products from {database}.{collection}")
+        return cursor
+
+    def fetch_products(self, database: str, collection: str,
+                       filter_query: Dict = None, limit: int = None) -> List[Dict]:
+        """Fetch products from MongoDB"""
+        products = list(self.iter_products(
+            database, collection, filter_query, limit))
+        logger.info("📦 Fetched %d products from %s.%s",
+                    len(products), database, collection)
         return products
 
     async def process_batch(self, products: List[Dict], batch_id: int) -> Dict[str, Any]:
         """Process a batch of products"""
-        logger.info(
-            f"🔄 Processing batch {batch_id} ({len(products)} products)")
+        logger.info("🔄 Processing batch %s (%d products)",
+                    batch_id, len(products))
 
         batch_results = {
             "batch_id": batch_id,
@@ -334,59 +408,89 @@ class ProductIngestionService:
         normalized_texts = []
         metadata_list = []
 
-        for product in products:
-            try:
-                text, metadata = self.normalizer.normalize_product(product)
-                normalized_texts.append(text)
-                metadata_list.append(metadata)
-                batch_results["processed"] += 1
-
-            except Exception as e:
+        prices, ratings = self.normalizer.extract_numeric_fields(products)
+        if prices is None:
+            prices = ratings = [None] * len(products)
+
+        if self.config.process_pool_min_batch and len(products) >= self.config.process_pool_min_batch:
+            # Large batches: spread normalization over worker processes
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            outcomes = await asyncio.gather(
+                *[loop.run_in_executor(pool, ProductNormalizer.normalize_product,
+                                       product, price, rating)
+                  for product, price, rating in zip(products, prices, ratings)],
+                return_exceptions=True)
+        else:
+            outcomes = []
+            for product, price, rating in zip(products, prices, ratings):
+                try:
+                    outcomes.append(self.normalizer.normalize_product(
+                        product, price, rating))
+                except Exception as e:
+                    outcomes.append(e)
+
+        for product, outcome in zip(products, outcomes):
+            if isinstance(outcome, BaseException):
                 error_info = {
                     "product_id": product.get('_id', 'unknown'),
-                    "error": str(e)
+                    "error": str(outcome)
                 }
                 batch_results["errors"].append(error_info)
-                logger.warning(
-                    f"⚠️  Error processing product {error_info['product_id']}: {e}")
+                logger.warning("⚠️  Error processing product %s: %s",
+                               error_info['product_id'], outcome)
+                continue
+
+            text, metadata = outcome
+            normalized_texts.append(text)
+            metadata_list.append(metadata)
+            batch_results["processed"] += 1
 
         # Insert batch into LightRAG
         if normalized_texts:
             try:
-                # Insert all normalized texts as a single batch
-                combined_text = "\n\n" + "="*80 + "\n\n".join(normalized_texts)
-                self.rag.insert(combined_text)
+                # Insert each product as its own document so it keeps its
+                # own chunks, embedding and graph context
+                await self.rag.ainsert(normalized_texts)
 
-                logger.info(f"✅ Batch {batch_id} inserted into LightRAG")
+                logger.info("✅ Batch %s inserted into LightRAG", batch_id)
 
             except Exception as e:
-                logger.error(f"❌ Failed to insert batch {batch_id}: {e}")
+                logger.error("❌ Failed to insert batch %s: %s", batch_id, e)
                 batch_results["errors"].append({"batch_error": str(e)})
 
         # Collect metadata summary
-        categories = {}
-        brands = {}
-        price_ranges = {}
-
-        for metadata in metadata_list:
-            categories[metadata.category] = categories.get(
-                metadata.category, 0) + 1
-            brands[metadata.brand] = brands.get(metadata.brand, 0) + 1
-            price_ranges[metadata.price_range] = price_ranges.get(
-                metadata.price_range, 0) + 1
-
         batch_results["metadata_summary"] = {
-            "categories": categories,
-            "brands": brands,
-            "price_ranges": price_ranges
+            "categories": Counter(m.category for m in metadata_list),
+            "brands": Counter(m.brand for m in metadata_list),
+            "price_ranges": Counter(m.price_range for m in metadata_list)
         }
 
         return batch_results
 
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the normalization process pool on first use"""
+        if self._pool is None:
+            workers = max(1, self.config.max_workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=_MP_CONTEXT)
+            logger.info("🧮 Started normalization process pool (%d workers)",
+                        workers)
+        return self._pool
+
+    async def aclose(self):
+        """Shut down the normalization pool, API clients and MongoDB client"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        await self._azure_llm.close()
+        await self._azure_embed.close()
+        self.product_mongo_client.close()
+
     async def ingest_products(self, database: str, collection: str,
                               filter_query: Dict = None, limit: int = None) -> Dict[str, Any]:
         """Main ingestion method"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         logger.info(
             f"🚀 Starting product ingestion from {database}.{collection}")
 
@@ -394,61 +498,80 @@ class ProductIngestionService:
         if not self.rag:
             await self.initialize_rag()
 
-        # Fetch products
-        products = self.fetch_products(
+        # Stream products: each batch is read from the cursor only when a
+        # worker slot frees up, so processing starts before the fetch ends
+        product_iter = self.iter_products(
             database, collection, filter_query, limit)
+        batch_size = self.config.batch_size
+        sem = asyncio.Semaphore(max(1, self.config.max_workers))
 
-        if not products:
+        async def run_batch(batch: List[Dict], batch_id: int) -> Dict[str, Any]:
+            try:
+                result = await self.process_batch(batch, batch_id)
+            finally:
+                sem.release()
+            logger.info("📊 Batch %s completed", batch_id)
+            return result
+
+        tasks = []
+        total_products = 0
+        while True:
+            await sem.acquire()
+            batch = await asyncio.to_thread(
+                lambda: list(islice(product_iter, batch_size)))
+            if not batch:
+                sem.release()
+                break
+            total_products += len(batch)
+            tasks.append(asyncio.create_task(
+                run_batch(batch, len(tasks) + 1)))
+
+        if not tasks:
             logger.warning("No products found to ingest")
             return {"status": "completed", "total_products": 0}
 
-        # Process in batches
-        total_batches = (len(products) + self.config.batch_size -
-                         1) // self.config.batch_size
-        batch_results = []
-
-        for i in range(0, len(products), self.config.batch_size):
-            batch_id = i // self.config.batch_size + 1
-            batch = products[i:i + self.config.batch_size]
-
-            result = await self.process_batch(batch, batch_id)
-            batch_results.append(result)
-
-            logger.info(f"📊 Batch {batch_id}/{total_batches} completed")
+        # gather keeps results in batch order
+        batch_results = await asyncio.gather(*tasks)
+        total_batches = len(tasks)
+        logger.info("📦 Streamed %d products from %s.%s",
+                    total_products, database, collection)
 
         # Compile final results
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-
-        total_processed = sum(r["processed"] for r in batch_results)
-        total_errors = sum(len(r["errors"]) for r in batch_results)
+        duration = time.perf_counter() - start_time
 
-        # Aggregate metadata
-        all_categories = {}
-        all_brands = {}
-        all_price_ranges = {}
+        # Aggregate counts and metadata in one pass over the batch results
+        total_processed = total_errors = 0
+        all_categories = Counter()
+        all_brands = Counter()
+        all_price_ranges = Counter()
 
+        # update() merges in place (in C); += would build a new Counter
+        # per batch. Batches with nothing to count are skipped outright.
         for result in batch_results:
-            summary = result["metadata_summary"]
-            for cat, count in summary.get("categories", {}).items():
-                all_categories[cat] = all_categories.get(cat, 0) + count
-            for brand, count in summary.get("brands", {}).items():
-                all_brands[brand] = all_brands.get(brand, 0) + count
-            for price_range, count in summary.get("price_ranges", {}).items():
-                all_price_ranges[price_range] = all_price_ranges.get(
-                    price_range, 0) + count
+            total_processed += result["processed"]
+            total_errors += len(result["errors"])
+            summary = result.get("metadata_summary") or _EMPTY_SUMMARY
+            categories = summary.get("categories")
+            if categories:
+                all_categories.update(categories)
+            brands = summary.get("brands")
+            if brands:
+                all_brands.update(brands)
+            price_ranges = summary.get("price_ranges")
+            if price_ranges:
+                all_price_ranges.update(price_ranges)
 
         final_results = {
             "status": "completed",
             "duration_seconds": duration,
-            "total_products": len(products),
+            "total_products": total_products,
             "total_processed": total_processed,
             "total_errors": total_errors,
             "batch_count": total_batches,
             "metadata_summary": {
-                "categories": all_categories,
-                "brands": all_brands,
-                "price_ranges": all_price_ranges
+                "categories": dict(all_categories),
+                "brands": dict(all_brands),
+                "price_ranges": dict(all_price_ranges)
             },
             "batch_results": batch_results
         }
@@ -465,11 +588,10 @@ class ProductIngestionService:
                 "RAG not initialized. Call ingest_products first.")
 
         # Use hybrid mode for complex reasoning across knowledge graph and embeddings
-        result = self.rag.query(
+        return await self.rag.aquery(
             requirements,
             param=QueryParam(mode="hybrid")
         )
-        return result
 
     async def semantic_search(self, query: str) -> str:
         """Semantic search for direct product matching"""
@@ -478,11 +600,10 @@ class ProductIngestionService:
                 "RAG not initialized. Call ingest_products first.")
 
         # Use local mode for semantic similarity
-        result = self.rag.query(
+        return await self.rag.aquery(
             query,
             param=QueryParam(mode="local")
         )
-        return result
 
 
 # Example usage and testing
@@ -538,7 +659,20 @@ async def main():
         logger.error(f"❌ Error in main: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        await service.aclose()
 
 
 if __name__ == "__main__":
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(level=logging.INFO)
+
+    # uvloop speeds up the I/O-bound Azure / MongoDB / storage traffic;
+    # fall back to the default loop where it is unavailable (e.g. Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
@@ -0,0 +1,281 @@
+"""
+Test the pure helpers behind product ingestion.
+
+Tests:
+1. Embedding coalescer: offset slicing across >2048-input splits
+2. Embedding coalescer: a failed request reaches every waiter
+3. Embedding coalescer: the size threshold flushes without the timer
+4. Legacy normalizer: price and rating bucket boundaries
+5. Enhanced metadata: feature richness and rating tier boundaries
+6. Legacy normalizer: batch numeric conversion with mixed str/None prices
+7. Batch insert barrier: statuses matched by doc id, not row order
+8. Pipeline status integrator: monitored jobs across separate asyncio.run calls
+
+Usage:
+    venv/bin/python -m pytest tests/test_product_ingestion_utils.py
+"""
+
+import asyncio
+import random
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.services.product_ingestion.clients import lightrag_client
+from lightrag.services.product_ingestion.clients.lightrag_client import (
+    EMBEDDING_MAX_INPUTS,
+    LightRAGClient,
+    _EmbeddingCoalescer,
+)
+from lightrag.services.product_ingestion.monitoring import PipelineStatusIntegrator
+from lightrag.base import DocStatus
+from lightrag.services.product_ingestion.models.metadata import EnhancedProductMetadata
+from lightrag.services.product_ingestion_service import ProductNormalizer
+
+
+class _FakeEmbeddings:
+    """Embeds each text as a one-element vector of its int value"""
+
+    def __init__(self, error: Exception = None):
+        self.calls = []
+        self.error = error
+
+    async def __call__(self, texts):
+        self.calls.append(len(texts))
+        if self.error is not None:
+            raise self.error
+        return [np.array([float(t)]) for t in texts]
+
+
+def _texts(start, count):
+    return [str(i) for i in range(start, start + count)]
+
+
+def _run_with_delay(coro_fn, delay):
+    """Run coro_fn() with EMBEDDING_COALESCE_DELAY patched to delay"""
+    original = lightrag_client.EMBEDDING_COALESCE_DELAY
+    lightrag_client.EMBEDDING_COALESCE_DELAY = delay
+    try:
+        return asyncio.run(coro_fn())
+    finally:
+        lightrag_client.EMBEDDING_COALESCE_DELAY = original
+
+
+def test_coalescer_slices_across_split_requests():
+    request = _FakeEmbeddings()
+    coalescer = _EmbeddingCoalescer(request)
+    sizes = (1500, 1000, 700)
+    starts = (0, 1500, 2500)
+
+    async def run():
+        return await asyncio.gather(*(
+            coalescer.embed(_texts(start, size))
+            for start, size in zip(starts, sizes)))
+
+    results = _run_with_delay(run, 0.01)
+
+    # 1500 + 1000 crosses the threshold and goes out as 2048 + 452;
+    # the last 700 wait for the timer on their own
+    assert request.calls == [EMBEDDING_MAX_INPUTS, 2500 - EMBEDDING_MAX_INPUTS, 700], request.calls
+    for result, start, size in zip(results, starts, sizes):
+        assert len(result) == size
+        assert [int(v[0]) for v in result] == list(range(start, start + size))
+    print(f"  ✅ Split calls {request.calls}, every caller got its own slice")
+
+
+def test_coalescer_error_reaches_every_waiter():
+    request = _FakeEmbeddings(error=RuntimeError("embedding down"))
+    coalescer = _EmbeddingCoalescer(request)
+
+    async def run():
+        return await asyncio.gather(
+            *(coalescer.embed(_texts(i * 10, 10)) for i in range(3)),
+            return_exceptions=True)
+
+    results = _run_with_delay(run, 0.01)
+
+    assert request.calls == [30], request.calls
+    assert len(results) == 3
+    for result in results:
+        assert isinstance(result, RuntimeError) and str(result) == "embedding down"
+    print("  ✅ One failed request, all 3 waiters raised")
+
+
+def test_coalescer_flushes_at_size_threshold():
+    request = _FakeEmbeddings()
+    coalescer = _EmbeddingCoalescer(request)
+
+    async def run():
+        # The timer would hold these for a minute; only the size flush
+        # can finish them inside the wait_for
+        small = asyncio.ensure_future(coalescer.embed(_texts(0, 48)))
+        await asyncio.sleep(0)
+        large = coalescer.embed(_texts(48, EMBEDDING_MAX_INPUTS - 48))
+        return await asyncio.wait_for(asyncio.gather(small, large), timeout=5)
+
+    small, large = _run_with_delay(run, 60.0)
+
+    assert request.calls == [EMBEDDING_MAX_INPUTS], request.calls
+    assert [int(v[0]) for v in small] == list(range(48))
+    assert [int(v[0]) for v in large] == list(range(48, EMBEDDING_MAX_INPUTS))
+    print("  ✅ Threshold reached, flushed without waiting for the timer")
+
+
+def test_legacy_price_and_rating_buckets():
+    # Each bin edge belongs to the bucket above it
+    prices = {
+        0: "budget", 49.99: "budget", 50: "mid-range",
+        199.99: "mid-range", 200: "premium",
+        999.99: "premium", 1000: "luxury", 5000: "luxury",
+    }
+    for price, label in prices.items():
+        assert ProductNormalizer.categorize_price(price) == label, (price, label)
+
+    ratings = {
+        0: "poor", 2.49: "poor", 2.5: "average",
+        3.49: "average", 3.5: "good",
+        4.49: "good", 4.5: "excellent", 5: "excellent",
+        float("nan"): "poor",
+    }
+    for rating, label in ratings.items():
+        assert ProductNormalizer.categorize_rating(rating) == label, (rating, label)
+    print("  ✅ Price edges 50/200/1000 and rating edges 2.5/3.5/4.5, NaN is poor")
+
+
+def _metadata(**kwargs):
+    return EnhancedProductMetadata(
+        product_id="p1", product_name="P", weburl="p", company="C", **kwargs)
+
+
+def test_enhanced_metadata_tiers():
+    # features and other_features count together; thresholds are inclusive
+    richness = {0: "basic", 4: "basic", 5: "moderate", 9: "moderate",
+                10: "rich", 19: "rich", 20: "comprehensive", 30: "comprehensive"}
+    for count, tier in richness.items():
+        half = count // 2
+        meta = _metadata(features=["f"] * half, other_features=["o"] * (count - half))
+        assert meta.feature_richness == tier, (count, tier, meta.feature_richness)
+
+    ratings = {
+        0.0: "unrated", 0.009: "unrated", 0.01: "poor", 2.49: "poor",
+        2.5: "average", 3.49: "average", 3.5: "good",
+        4.49: "good", 4.5: "excellent", 5.0: "excellent",
+        None: "unrated", float("nan"): "unrated",
+    }
+    for rating, tier in ratings.items():
+        meta = _metadata(overall_rating=rating)
+        assert meta.rating_tier == tier, (rating, tier, meta.rating_tier)
+    print("  ✅ Feature edges 5/10/20 and rating edges 0.01/2.5/3.5/4.5, NaN/None unrated")
+
+
+def test_extract_numeric_fields_mixed_prices():
+    # Numeric strings convert like float() would; missing fields are 0
+    products = [
+        {"price": "19.99", "rating": 4},
+        {"price": 5, "rating": "3.5"},
+        {"name": "no price or rating"},
+    ]
+    prices, ratings = ProductNormalizer.extract_numeric_fields(products)
+    assert prices == [19.99, 5.0, 0.0], prices
+    assert ratings == [4.0, 3.5, 0.0], ratings
+
+    # A None or unparsable value sends the whole batch down the
+    # per-product path, where that product raises its own error
+    for bad in (
+        [{"price": "10", "rating": 4}, {"price": None, "rating": 4}],
+        [{"price": None, "rating": 4}, {"price": "10", "rating": 4}],
+        [{"price": "10", "rating": 4}, {"price": "n/a", "rating": 4}],
+        [{"price": "10", "rating": None}],
+    ):
+        assert ProductNormalizer.extract_numeric_fields(bad) == (None, None), bad
+
+    try:
+        ProductNormalizer.normalize_product({"price": None})
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("None price should fail in normalize_product")
+    print("  ✅ Numeric strings convert, None/unparsable defer to per-product")
+
+
+class _FakeDocStatus:
+    """Doc status storage whose get_by_ids shuffles rows and drops missing ids"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_by_ids(self, ids):
+        rows = [self.rows[i] for i in ids if i in self.rows]
+        random.shuffle(rows)
+        return rows
+
+    async def get_by_id(self, id):
+        return self.rows.get(id)
+
+
+class _FakeRAG:
+    def __init__(self, rows):
+        self.doc_status = _FakeDocStatus(rows)
+
+    async def apipeline_enqueue_documents(self, **kwargs):
+        pass
+
+    async def apipeline_process_enqueue_documents(self):
+        pass
+
+
+def test_batch_insert_matches_statuses_by_doc_id():
+    # No row for p3; rows for p1/p2/p4 come back in arbitrary order
+    rows = {
+        "p1": {"status": DocStatus.PROCESSED},
+        "p2": {"status": DocStatus.FAILED},
+        "p4": {"status": DocStatus.PROCESSED},
+    }
+    documents = [(f"text {i}", f"source_{i}", f"p{i}", None, None)
+                 for i in range(1, 5)]
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        client = object.__new__(LightRAGClient)
+        client.working_dir = working_dir
+        client.completed_ids_file = os.path.join(working_dir, "completed.ckpt")
+        client._completed_ids = set()
+        client._pending_ids = []
+        client._checkpoint_interval = 1
+        client._checkpoint_lock = asyncio.Lock()
+        client._batch_timeout = 5
+        client._drains = set()
+        client.rag = _FakeRAG(rows)
+
+        for _ in range(5):
+            client._completed_ids.clear()
+            failed = asyncio.run(client.insert_texts_with_sources(documents, batch_id=1))
+            assert failed == ["p2", "p3"], failed
+            assert client._completed_ids == {"p1", "p4"}, client._completed_ids
+    print("  ✅ Shuffled and missing status rows, only processed products checkpointed")
+
+
+def test_integrator_survives_a_new_event_loop():
+    integrator = PipelineStatusIntegrator()
+    integrator.pipeline_status = {}
+    integrator.pipeline_status_lock = asyncio.Lock()
+    integrator._initialized = True
+
+    async def run(job_name):
+        async with integrator.monitor_job(job_name, total_records=50, batch_size=25) as monitor:
+            await monitor.update_progress(1, "batch 1")
+            await monitor.update_progress(2, "batch 2")
+
+    # The second run gets a fresh queue and flusher instead of the first
+    # loop's, and flush() in monitor_job still sees every update applied
+    for job_name in ("first", "second"):
+        asyncio.run(run(job_name))
+        assert integrator.pipeline_status["busy"] is False
+        assert integrator.pipeline_status["cur_batch"] == 2
+        assert job_name in integrator.pipeline_status["latest_message"]
+    assert len(integrator.pipeline_status["history_messages"]) == 8
+    print("  ✅ Two asyncio.run jobs, both fully flushed")